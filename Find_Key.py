@@ -2,199 +2,67 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-import os
-import re
-import random
-from difflib import get_close_matches
-from supabase import create_client, Client
-from dotenv import load_dotenv
-
-# --- Load environment variables ---
-load_dotenv()
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SERVICE_ROLE_KEY")
-
-if not SUPABASE_URL or not SUPABASE_KEY:
-    raise ValueError("❌ Missing SUPABASE_URL or SERVICE_ROLE_KEY in .env")
-
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-
-# --- Table names ---
-GDSONG_TABLE = "gdsongdata"
-NONGDSONG_TABLE = "nongdsongdata"
-
-# ---------------------- POINTS HELPERS ----------------------
-def fetch_points():
-    """Load all points from Supabase (normalize to ints)."""
-    res = supabase.table("points").select("*").execute()
-    points = {}
-    for row in (res.data or []):
-        points[str(row["user_id"])] = {
-            "name": row.get("name", "Unknown"),
-            "points": int(row.get("points", 0))
-        }
-    return points
-
-def save_points(points: dict):
-    """Upsert points to Supabase (store ints)."""
-    payload = []
-    for user_id, info in points.items():
-        payload.append({
-            "user_id": user_id,
-            "name": info.get("name", "Unknown"),
-            "points": int(info.get("points", 0))
-        })
-    if payload:
-        supabase.table("points").upsert(payload).execute()
-
-# --- Loaders ---
-def load_songdata():
-    """Fetch songs from both tables, formatted as '(Author) - (Title)'."""
-    combined = {}
-
-    try:
-        gd_res = supabase.table(GDSONG_TABLE).select("*").execute()
-        nongd_res = supabase.table(NONGDSONG_TABLE).select("*").execute()
-        all_data = (gd_res.data or []) + (nongd_res.data or [])
-
-        for row in all_data:
-            title = row.get("title")
-            author = row.get("author") or "Unknown Artist"
-            if not title:
-                continue
-
-            # Use parentheses around author and title as requested
-            full_name = f"({author}) - ({title})"
-            combined[full_name] = {
-                "title": title,
-                "author": author,
-                "bpm": row.get("bpm"),
-                "key": row.get("key_signature"),
-                "time_signature": row.get("time_signature"),
-                "changes": row.get("changes") or [],
-            }
-
-        print(f"✅ Loaded {len(combined)} songs from Supabase.")
-    except Exception as e:
-        print(f"⚠️ Failed to fetch song data from Supabase: {e}")
-
-    return combined
-
-
-songdata = load_songdata()
-
+from song_catalog import SongSearchIndex, search_index, song_catalog, songdata
+from song_timeline import Timeline, parse_timestamp, format_timestamp
 
 # --- Cog ---
 class FindKey(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.points = fetch_points()
+
+    async def cog_load(self):
+        song_catalog.start(self.bot.db)
 
     # ---------- Helpers ----------
-    @staticmethod
-    def _norm(s: str) -> str:
-        """Normalize for matching."""
-        s = s.lower()
-        s = re.sub(r"[^a-z0-9\s]+", " ", s)
-        s = re.sub(r"\s+", " ", s).strip()
-        return s
-
-    @staticmethod
-    def _best_suggestions(query: str, names, n=25):
-        """Return fuzzy + substring matches."""
-        if not query:
-            return list(names)[:n]
-
-        norm_query = FindKey._norm(query)
-        sub_matches = [name for name in names if norm_query in FindKey._norm(name)]
-        fuzzy_matches = get_close_matches(query, names, n=n, cutoff=0.3)
-
-        seen = set()
-        merged = []
-        for lst in (sub_matches, fuzzy_matches):
-            for name in lst:
-                if name not in seen:
-                    seen.add(name)
-                    merged.append(name)
-                if len(merged) >= n:
-                    break
-            if len(merged) >= n:
-                break
-        return merged
-
-    def _autocorrect_title(self, query: str, names):
+    def _autocorrect_title(self, query: str, index: SongSearchIndex):
         """Find best match among '(Author) - (Title)' keys and by title-only / author-title input."""
         if not query:
             return None, None
 
-        # Exact match (including parentheses)
-        if query in names:
-            return query, None
-
-        # Case-insensitive exact full-key match
-        lower_map = {name.lower(): name for name in names}
-        if query.lower() in lower_map:
-            corrected = lower_map[query.lower()]
-            return corrected, f"Matched case-insensitive → **{corrected}**"
-
-        q_norm = self._norm(query)
-
-        # If user provided "author - title" without parentheses, try to match both author and title
-        if "-" in query:
-            parts = [p.strip() for p in query.split("-", 1)]
-            if len(parts) == 2:
-                left_norm, right_norm = self._norm(parts[0]), self._norm(parts[1])
-                for name in names:
-                    info = songdata.get(name, {})
-                    if self._norm(info.get("author", "")) == left_norm and self._norm(info.get("title", "")) == right_norm:
-                        return name, f"Matched author and title → **{name}**"
-
-        # Title-only exact normalized match (useful when user types only the song name)
-        title_matches = [name for name in names if self._norm(songdata.get(name, {}).get("title", "")) == q_norm]
-        if len(title_matches) == 1:
-            return title_matches[0], f"Matched song title → **{title_matches[0]}**"
-
-        # Unique substring match (checks both full key and title)
-        subs = [name for name in names if query.lower() in name.lower() or q_norm in self._norm(songdata.get(name, {}).get("title", ""))]
-        if len(subs) == 1:
-            return subs[0], f"Unique substring match → **{subs[0]}**"
-
-        # Fallback to fuzzy match on full keys
-        fuzzy = get_close_matches(query, names, n=1, cutoff=0.6)
-        if fuzzy:
-            return fuzzy[0], f"No exact match. Closest → **{fuzzy[0]}**"
+        chosen, reason = index.resolve(query)
+        if chosen is not None:
+            return chosen, reason
+
+        # Fallback to the closest full key by trigram overlap
+        closest = index.closest(query)
+        if closest is not None:
+            return closest, f"No exact match. Closest → **{closest}**"
 
         return None, None
 
     # ---------- Autocomplete ----------
     async def song_autocomplete(self, interaction: discord.Interaction, current: str):
-        names = list(songdata.keys())
-        suggestions = self._best_suggestions(current, names, n=25)
-        return [app_commands.Choice(name=name, value=name) for name in suggestions]
+        suggestions = search_index().suggest(current, n=25)
+        return [app_commands.Choice(name=name, value=name) for name in suggestions if len(name) <= 100]
 
     # ---------- Command ----------
     @app_commands.command(name="find_key", description="Get the key, BPM, and time signature of a song")
-    @app_commands.describe(song="Enter 'Artist - Song' or just the song name")
+    @app_commands.describe(
+        song="Enter 'Artist - Song' or just the song name",
+        at="Timestamp to look up, e.g. 1:12 (uses the song's BPM/key changes)",
+    )
     @app_commands.autocomplete(song=song_autocomplete)
-    async def find_key(self, interaction: discord.Interaction, song: str):
-        self.points = fetch_points()
-        user_id = str(interaction.user.id)
-
-        if random.randint(1, 1000) == 1:
-            self.points[user_id]["points"] += 5000
-            await interaction.response.send_message("You just won the slop lottery, you have received 5000 Slop Points")
-            save_points(self.points)
+    async def find_key(self, interaction: discord.Interaction, song: str, at: str = None):
+        if not song_catalog.loaded.is_set():
+            await interaction.response.send_message("⏳ The song catalog is still loading, try again in a few seconds.", ephemeral=True)
             return
-        
-        names = list(songdata.keys())
-        chosen, reason = self._autocorrect_title(song, names)
+
+        seconds = None
+        if at is not None:
+            seconds = parse_timestamp(at)
+            if seconds is None:
+                await interaction.response.send_message(f"❌ `{at}` isn't a timestamp (try `1:12`).", ephemeral=True)
+                return
+
+        index = search_index()
+        chosen, reason = self._autocorrect_title(song, index)
 
         if not chosen:
-            suggestions = self._best_suggestions(song, names, n=10)
+            suggestions = index.suggest(song, n=5)
             if suggestions:
                 await interaction.response.send_message(
                     f"❌ No exact match for `{song}`.\nDid you mean: " +
-                    ", ".join(f"`{s}`" for s in suggestions[:5]) + "?",
+                    ", ".join(f"`{s}`" for s in suggestions) + "?",
                     ephemeral=True,
                 )
             else:
@@ -229,10 +97,19 @@ class FindKey(commands.Cog):
                 if "key" in ch:
                     msg += f"\n> {ch['time']} → {ch['key']}"
 
+        if seconds is not None:
+            timeline = song_info.get("timeline") or Timeline.from_song(song_info)
+            section = timeline.at(seconds)
+            msg += (
+                f"\n**At {format_timestamp(seconds)}** (section {section.label()}): "
+                f"{section.key or 'unknown key'} at {section.bpm or 'unknown'} BPM"
+            )
+
         await interaction.response.send_message(msg)
 
 
 # ---------- setup ----------
 async def setup(bot: commands.Bot):
+    # The catalog loads in the background (see SongCatalog); commands see it fill in
     await bot.add_cog(FindKey(bot))
-    print(f"✅ Find_Key cog loaded — {len(songdata)}")
+    print("✅ Find_Key cog loaded — song catalog loading in the background")
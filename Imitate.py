@@ -4,27 +4,16 @@ from discord.ext import commands
 import random
 import asyncio
 import logging
-import os
-from dotenv import load_dotenv
-from supabase import create_client, Client
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
 GUILD_ID = 1411767823730085971
 
-# ----------------------- SUPABASE SETUP -----------------------
-load_dotenv()
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SERVICE_ROLE_KEY = os.getenv("SERVICE_ROLE_KEY")
-supabase: Client = create_client(SUPABASE_URL, SERVICE_ROLE_KEY)
-
 # ----------------------- HELPERS -----------------------
-def fetch_imitations():
+async def fetch_imitations(db):
     try:
-        response = supabase.table("imitations").select("*").execute()
-
-        data = response.data or []
+        data = await db.select("imitations")
         imitations = {}
         for row in data:
             name = row.get("name")
@@ -41,44 +30,31 @@ def fetch_imitations():
         logger.exception(f"Failed to fetch imitations: {e}")
         return {}
 
-def fetch_points():
-    """Fetch user points from Supabase."""
-    try:
-        response = supabase.table("points").select("*").execute()
-        data = response.data or []
-        points = {}
-        for row in data:
-            user_id = str(row.get("user_id"))
-            points[user_id] = {
-                "name": row.get("name", "Unknown#0000"),
-                "points": int(row.get("points", 0))
-            }
-        return points
-    except Exception as e:
-        logger.exception(f"Failed to fetch points: {e}")
-        return {}
-
-def save_points(points):
-    """Upsert (update or insert) all points into Supabase with ints."""
-    try:
-        payload = [
-            {"user_id": uid, "name": data["name"], "points": int(data["points"])}
-            for uid, data in points.items()
-        ]
-        if payload:
-            supabase.table("points").upsert(payload, on_conflict="user_id").execute()
-    except Exception as e:
-        logger.exception(f"Failed to save points: {e}")
-
 # ----------------------- MAIN COG -----------------------
 class Imitate(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.active_game = None
         self.active_task = None
+        self._game_route = None  # router entry for the active game's channel
+
+        self.imitations = {}
+        self.imitations_lower = {}
+
+    async def cog_load(self):
+        await self._reload_imitations()
+
+    async def cog_unload(self):
+        self._clear_game()
 
-        self.imitations = fetch_imitations()
-        self.points = fetch_points()
+    def _clear_game(self):
+        self.active_game = None
+        if self._game_route is not None:
+            self.bot.router.remove(self._game_route)
+            self._game_route = None
+
+    async def _reload_imitations(self):
+        self.imitations = await fetch_imitations(self.bot.db)
         self.imitations_lower = {k.lower(): v for k, v in self.imitations.items()}
 
     # ---------------- Autocomplete ----------------
@@ -91,15 +67,6 @@ class Imitate(commands.Cog):
     @app_commands.describe(keyword="Pick who to imitate")
     @app_commands.autocomplete(keyword=keyword_autocomplete)
     async def imitate(self, interaction: discord.Interaction, keyword: str):
-        self.points = fetch_points()
-        user_id = str(interaction.user.id)
-
-        if random.randint(1, 1000) == 1:
-            self.points[user_id]["points"] += 5000
-            await interaction.response.send_message("You just won the slop lottery, you have received 5000 Slop Points!")
-            save_points(self.points)
-            return
-
         if keyword.lower() not in self.imitations_lower:
             await interaction.response.send_message("❌ That person isn't cool enough to be made fun of", ephemeral=True)
             return
@@ -116,15 +83,6 @@ class Imitate(commands.Cog):
     # ---------------- /imitate_game ----------------
     @app_commands.command(name="imitate_game", description="Start an imitation game")
     async def imitate_game(self, interaction: discord.Interaction):
-        self.points = fetch_points()
-        user_id = str(interaction.user.id)
-
-        if random.randint(1, 1000) == 1:
-            self.points[user_id]["points"] += 5000
-            await interaction.response.send_message("You just won the slop lottery, you have received 5000 Slop Points!")
-            save_points(self.points)
-            return
-
         if self.active_game:
             await interaction.response.send_message("A game is already active!", ephemeral=True)
             return
@@ -138,6 +96,8 @@ class Imitate(commands.Cog):
             imitation = imitation.replace("RANDOM_KEYWORD_NAME", replacement, 1)
 
         self.active_game = {"keyword": keyword.lower(), "channel": interaction.channel, "start_time": None}
+        # Guesses only matter in this channel while the game runs
+        self._game_route = self.bot.router.add(self.on_message, channels={interaction.channel.id})
         await interaction.response.send_message(f"Guess who said this:\n\n{imitation}\n\n")
         self.active_game["start_time"] = asyncio.get_event_loop().time()
         self.active_task = asyncio.create_task(self._end_game_after_delay(interaction.channel, keyword))
@@ -147,18 +107,16 @@ class Imitate(commands.Cog):
             await asyncio.sleep(30)
             if self.active_game:
                 await channel.send(f"⏰ Time's up! Nobody guessed correctly. The answer was **{keyword}**.")
-                self.active_game = None
+                self._clear_game()
                 self.active_task = None
         except discord.NotFound:
-            self.active_game = None
+            self._clear_game()
             self.active_task = None
 
-    # ---------------- Message Listener ----------------
-    @commands.Cog.listener()
+    # ---------------- Message Handler ----------------
+    # Routed only while a game is active, and only for its channel
     async def on_message(self, message: discord.Message):
-        if not self.active_game or message.author.bot:
-            return
-        if message.channel != self.active_game["channel"]:
+        if not self.active_game:
             return
 
         guess = message.content.strip().lower()
@@ -174,23 +132,15 @@ class Imitate(commands.Cog):
             time_left = max(0, total_time - elapsed)
             points_awarded = max(1, round(time_left / 3))
 
-            if user_id not in self.points:
-                self.points[user_id] = {"name": username, "points": 0}
+            total = await self.bot.ledger.adjust(user_id, points_awarded, "imitate_guess", name=username)
 
-            self.points[user_id]["points"] += points_awarded
-            self.points[user_id]["name"] = username
-            save_points(self.points)
-
-            await message.reply(f"✅ You won! You now have {self.points[user_id]['points']} Slop Points. (+{points_awarded})")
-            self.active_game = None
+            await message.reply(f"✅ You won! You now have {total} Slop Points. (+{points_awarded})")
+            self._clear_game()
             if self.active_task:
                 self.active_task.cancel()
                 self.active_task = None
         else:
-            if user_id not in self.points:
-                self.points[user_id] = {"name": username, "points": 0}
-            self.points[user_id]["points"] -= 1
-            save_points(self.points)
+            await self.bot.ledger.adjust(user_id, -1, "imitate_wrong_guess", name=username)
             try:
                 await message.add_reaction("❌")
             except discord.Forbidden:
@@ -199,40 +149,35 @@ class Imitate(commands.Cog):
     # ---------------- /imitate_points ----------------
     @app_commands.command(name="imitate_points", description="Check your Slop Points")
     async def imitate_points(self, interaction: discord.Interaction):
-        self.points = fetch_points()
+        ledger = self.bot.ledger
         user_id = str(interaction.user.id)
 
-        if random.randint(1, 1000) == 1:
-            self.points[user_id]["points"] += 5000
-            await interaction.response.send_message("You just won the slop lottery, you have received 5000 Slop Points!")
-            save_points(self.points)
-            return
-
-        data = self.points.get(user_id, {"name": str(interaction.user), "points": 0})
-        await interaction.response.send_message(f"You have {data['points']} points.")
+        rank = ledger.rank(user_id)
+        rank_text = f" (rank #{rank} of {len(ledger)})" if rank else ""
+        await interaction.response.send_message(f"You have {ledger.balance(user_id)} points.{rank_text}")
 
     # ---------------- /imitate_leaderboard ----------------
     @app_commands.command(name="imitate_leaderboard", description="Show the Slop Points leaderboard")
-    async def imitate_leaderboard(self, interaction: discord.Interaction):
-        self.points = fetch_points()
-        user_id = str(interaction.user.id)
-
-        if random.randint(1, 1000) == 1:
-            self.points[user_id]["points"] += 5000
-            await interaction.response.send_message("You just won the slop lottery, you have received 5000 Slop Points!")
-            save_points(self.points)
-            return
-        
-        if not self.points:
+    @app_commands.describe(page="Leaderboard page (10 users per page)")
+    async def imitate_leaderboard(self, interaction: discord.Interaction, page: int = 1):
+        ledger = self.bot.ledger
+        if not len(ledger):
             await interaction.response.send_message("No one has any Slop Points yet!", ephemeral=True)
             return
 
-        sorted_users = sorted(self.points.items(), key=lambda item: item[1]["points"], reverse=True)
+        pages = ledger.page_count()
+        page = min(max(page, 1), pages)
         embed = discord.Embed(title="🏆 Slop Points Leaderboard", color=discord.Color.gold())
 
-        for rank, (uid, data) in enumerate(sorted_users[:10], start=1):
+        for rank, uid, data in ledger.leaderboard_page(page):
             embed.add_field(name=f"#{rank} – {data['name']}", value=f"{data['points']} points", inline=False)
 
+        footer = f"Page {page}/{pages}"
+        my_rank = ledger.rank(interaction.user.id)
+        if my_rank:
+            footer += f" • Your rank: #{my_rank}"
+        embed.set_footer(text=footer)
+
         await interaction.response.send_message(embed=embed)
 
     # ---------------- /add_imitation ----------------
@@ -246,9 +191,9 @@ class Imitate(commands.Cog):
         name = name.strip()
         imitation = imitation.strip()
         # add new imitation to supabase where name is type text and quotes is type text[]
+        db = self.bot.db
         try:
-            existing = supabase.table("imitations").select("*").eq("name", name).execute()
-            data = existing.data or []
+            data = await db.select("imitations", name=name)
             if data:
                 quotes = data[0].get("imitations") or []
                 if isinstance(quotes, str):
@@ -258,27 +203,23 @@ class Imitate(commands.Cog):
                     except Exception:
                         quotes = [quotes]
                 quotes.append(imitation)
-                supabase.table("imitations").update({"imitations": quotes}).eq("name", name).execute()
+                await db.execute(db.table("imitations").update({"imitations": quotes}).eq("name", name))
             else:
-                supabase.table("imitations").insert({"name": name, "imitations": [imitation]}).execute()
+                await db.execute(db.table("imitations").insert({"name": name, "imitations": [imitation]}))
 
-            self.imitations = fetch_imitations()
-            self.imitations_lower = {k.lower(): v for k, v in self.imitations.items()}
+            await self._reload_imitations()
 
             await interaction.response.send_message(f"✅ Added imitation for **{name}**!", ephemeral=True)
         except Exception as e:
             logger.exception(f"Failed to add imitation: {e}")
             await interaction.response.send_message(f"❌ Failed to add imitation: {e}", ephemeral=True)
 
-        self.imitations = fetch_imitations()
-
     # ---------------- /reload_data ----------------
     @app_commands.command(name="reload_data", description="Reload imitation and points data from Supabase")
     async def reload_data(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
-        self.imitations = fetch_imitations()
-        self.imitations_lower = {k.lower(): v for k, v in self.imitations.items()}
-        self.points = fetch_points()
+        await self._reload_imitations()
+        await self.bot.ledger.load()
         await interaction.followup.send("✅ Reloaded imitation data and points from Supabase!")
 
 # ----------------------- Setup -----------------------
@@ -169,8 +169,13 @@ class ReplaceOtherBots(commands.Cog):
         self.sticky_enabled = False
         self._sticky_state = defaultdict(dict)
 
+    async def cog_load(self):
+        # only the sticky and AI channels are routed here; bots are filtered out
+        self._route = self.bot.router.add(self.on_message, channels=STICKY_CHANNELS | {TARGET_CHANNEL_ID})
+
     def cog_unload(self):
         self.worker_task.cancel()
+        self.bot.router.remove(self._route)
 
     # ---------------------
     # Sticky toggle command
@@ -215,15 +220,8 @@ class ReplaceOtherBots(commands.Cog):
     # ---------------------
     # Message handler
     # ---------------------
-    @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
-        if message.author.bot:
-            return
-
-        # Allow commands
-        await self.bot.process_commands(message)
-
-        # Ignore commands for sticky
+        # Commands are processed by SlopGen's on_message; ignore them for sticky
         if message.content.startswith(BOT_PREFIX):
             return
 
@@ -5,8 +5,12 @@ import logging
 from dotenv import load_dotenv
 import os
 import asyncio
-from supabase import create_client
+from supabase import create_client, ClientOptions
 import requests
+from slop_db import SlopDB, DEFAULT_TIMEOUT
+from slop_points import PointsLedger
+from interaction_hooks import SlopCommandTree, LotteryStage
+from event_router import MessageRouter
 
 # --- Load environment variables ---
 load_dotenv()
@@ -22,7 +26,13 @@ if not token:
     raise ValueError("DISCORD_TOKEN not found in environment variables.")
 
 # --- Create Supabase client ---
-supabase = create_client(SUPABASE_URL, SERVICE_ROLE_KEY)
+# The only client in the process; cogs reach it through bot.db
+supabase = create_client(
+    SUPABASE_URL,
+    SERVICE_ROLE_KEY,
+    options=ClientOptions(postgrest_client_timeout=DEFAULT_TIMEOUT),
+)
+db = SlopDB(supabase)
 
 # --- Logging ---
 logger = logging.getLogger(__name__)
@@ -41,37 +51,14 @@ BLOCKED_CHANNEL_IDS = [
 ]
 
 # --- Supabase helpers ---
-# These helpers run potentially-blocking supabase calls in the default executor to avoid blocking the event loop.
+# Thin wrappers over bot.db, which runs the blocking supabase calls off the event loop.
 async def get_misc_value(attribute: str, default: int = 0) -> int:
-    """Fetch the count of an attribute from Supabase (runs in executor)."""
-    loop = asyncio.get_running_loop()
-
-    def _sync_get():
-        res = supabase.from_("miscinfo").select("count").eq("attribute", attribute).execute()
-        data = getattr(res, "data", None)
-        if data:
-            return data[0]["count"]
-        return default
-
-    try:
-        return await loop.run_in_executor(None, _sync_get)
-    except Exception:
-        logging.exception("Failed to fetch misc value %s", attribute)
-        return default
+    """Fetch the count of an attribute from Supabase."""
+    return await db.get_misc(default, attribute=attribute)
 
 async def set_misc_value(attribute: str, value: int):
-    """Set the count of an attribute in Supabase (runs in executor)."""
-    loop = asyncio.get_running_loop()
-
-    def _sync_set():
-        res = supabase.from_("miscinfo").update({"count": value}).eq("attribute", attribute).execute()
-        if getattr(res, "count", 0) == 0:
-            supabase.from_("miscinfo").insert({"attribute": attribute, "count": value}).execute()
-
-    try:
-        await loop.run_in_executor(None, _sync_set)
-    except Exception:
-        logging.exception("Failed to set misc value %s to %s", attribute, value)
+    """Set the count of an attribute in Supabase."""
+    await db.set_misc(value, attribute=attribute)
 
 
 def warm_up_ollama():
@@ -111,10 +98,26 @@ def case_insensitive_prefix(bot, message):
             return prefix
     return commands.when_mentioned(bot, message)
 
-bot = commands.Bot(command_prefix=case_insensitive_prefix, intents=intents, case_insensitive=True)
+class SlopBot(commands.Bot):
+    async def close(self):
+        # Flush buffered Slop Points before the connection goes away
+        try:
+            await self.ledger.close()
+        except Exception:
+            logging.exception("Failed to flush Slop Points on shutdown")
+        await super().close()
+        self.db.close()
+
+bot = SlopBot(command_prefix=case_insensitive_prefix, intents=intents, case_insensitive=True, tree_cls=SlopCommandTree)
+
+# Expose the shared data layer to cogs via bot.db
+bot.db = db
+
+# Shared Slop Points ledger, loaded once in on_ready before any cog needs it
+bot.ledger = PointsLedger(db)
 
-# Expose supabase client to cogs via bot.supabase
-bot.supabase = supabase
+# Cogs register their on_message handlers here instead of as listeners
+bot.router = MessageRouter()
 
 BOT_VERSION = "2.0.2"
 GUILD_ID = 1411767823730085971
@@ -145,6 +148,28 @@ COGS = [
     "keyword_reactions",
 ]
 
+# Slash commands that roll the 1-in-1000 slop lottery before running
+LOTTERY_COMMANDS = {
+    "imitate",
+    "imitate_game",
+    "imitate_points",
+    "imitate_leaderboard",
+    "find_key",
+    "semitone_calculator",
+    "gamble",
+    "pitch",
+    "stretch",
+    "ngaudio",
+    "acapella",
+    "give_sergeant_singing",
+    "guess_gdsong_key",
+    "guess_non_gdsong_key",
+    "ping_shlant",
+}
+
+# --- App command pre-hooks ---
+bot.tree.add_pre_hook(LotteryStage(bot.ledger, LOTTERY_COMMANDS))
+
 # --- Events ---
 @bot.event
 async def on_ready():
@@ -155,6 +180,11 @@ async def on_ready():
         _ping_lock = asyncio.Lock()
 
     try:
+        # Load Slop Points once; cogs read balances from bot.ledger
+        if not bot.ledger.loaded:
+            await bot.ledger.load()
+        bot.ledger.start()
+
         # Load extensions
         for cog in COGS:
             try:
@@ -198,6 +228,8 @@ async def on_ready():
 
 @bot.event
 async def on_message(message):
+    bot.router.dispatch(message)
+
     if message.content.lower() == "slop ping":
         if message.channel.id not in BLOCKED_CHANNEL_IDS:
             # Use buffered ping counter to avoid frequent DB writes
@@ -212,6 +244,11 @@ async def on_message(message):
     await bot.process_commands(message)
 
 # --- Background flush loop ---
+def _sync_ping_flush(new_total: int):
+    res = supabase.from_("miscinfo").update({"count": new_total}).eq("attribute", "ping_count").execute()
+    if not res.data:
+        supabase.from_("miscinfo").insert({"attribute": "ping_count", "count": new_total}).execute()
+
 async def _ping_flush_loop():
     global _ping_pending, _ping_persisted
     while True:
@@ -224,15 +261,9 @@ async def _ping_flush_loop():
             continue
 
         new_total = _ping_persisted + pending
-        loop = asyncio.get_running_loop()
-
-        def _sync_flush():
-            res = supabase.from_("miscinfo").update({"count": new_total}).eq("attribute", "ping_count").execute()
-            if getattr(res, "count", 0) == 0:
-                supabase.from_("miscinfo").insert({"attribute": "ping_count", "count": new_total}).execute()
 
         try:
-            await loop.run_in_executor(None, _sync_flush)
+            await db.run(_sync_ping_flush, new_total)
             _ping_persisted = new_total
             logging.info("Flushed %s pings to Supabase; new total %s", pending, new_total)
         except Exception:
@@ -1,17 +1,20 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-import os
 import random
-from supabase import create_client, Client
-from dotenv import load_dotenv
-from semitone_calculator import normalize_key, normalized_keys
+import asyncio
+import functools
+import heapq
+import logging
+import time
+from bisect import bisect_left, bisect_right
+from music_keys import Key, MODE_INTERVALS, SHARP_PITCH_CLASSES, normalize_key, table_key
+from song_catalog import search_index, song_catalog, songdata as catalog
+from song_timeline import Timeline, parse_timestamp, format_timestamp
 
-# --- Config / Supabase ---
-load_dotenv()
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SERVICE_ROLE_KEY = os.getenv("SERVICE_ROLE_KEY")
-supabase: Client = create_client(SUPABASE_URL, SERVICE_ROLE_KEY)
+logger = logging.getLogger(__name__)
+
+BANNED_REFRESH_INTERVAL = 300  # seconds between re-reads of banned_combos (picks up other instances' bans)
 
 # --- Debug flags ---
 DEBUG = False
@@ -21,41 +24,15 @@ DEBUG_SHOW_ALL_ATTEMPTS = False
 DEBUG_SHOW_BPM_CHANGE = True
 
 # --- Music theory helpers ---
-key_map = {"C":0,"C#":1,"D":2,"D#":3,"E":4,"F":5,"F#":6,"G":7,"G#":8,"A":9,"A#":10,"B":11}
-
-mode_intervals = {
-    "Major": [0, 2, 4, 5, 7, 9, 11],
-    "Ionian": [0, 2, 4, 5, 7, 9, 11],
-    "Lydian": [0, 2, 4, 6, 7, 9, 11],
-    "Mixolydian": [0, 2, 4, 5, 7, 9, 10],
-    "Minor": [0, 2, 3, 5, 7, 8, 10],
-    "Aeolian": [0, 2, 3, 5, 7, 8, 10],
-    "Dorian": [0, 2, 3, 5, 7, 9, 10],
-    "Phrygian": [0, 1, 3, 5, 7, 8, 10],
-    "Locrian": [0, 1, 3, 5, 6, 8, 10],
-    "m": [0, 2, 3, 5, 7, 8, 10]
-}
-
-relative_key_groups = [
-    ["C Major", "A Minor", "E Phrygian", "D Dorian", "G Mixolydian", "B Locrian", "F Lydian"],
-    ["Db Major", "Bb Minor", "F Phrygian", "Eb Dorian", "Ab Mixolydian", "C Locrian", "Gb Lydian"],
-    ["D Major", "B Minor", "Gb Phrygian", "E Dorian", "A Mixolydian", "Db Locrian", "G Lydian"],
-    ["Eb Major", "C Minor", "G Phrygian", "F Dorian", "Bb Mixolydian", "D Locrian", "Ab Lydian"],
-    ["E Major", "Db Minor", "Ab Phrygian", "Gb Dorian", "B Mixolydian", "Eb Locrian", "A Lydian"],
-    ["F Major", "D Minor", "A Phrygian", "G Dorian", "C Mixolydian", "E Locrian", "Bb Lydian"],
-    ["Gb Major", "Eb Minor", "Bb Phrygian", "Ab Dorian", "Db Mixolydian", "F Locrian", "B Lydian"],
-    ["G Major", "E Minor", "B Phrygian", "A Dorian", "D Mixolydian", "Gb Locrian", "C Lydian"],
-    ["Ab Major", "F Minor", "C Phrygian", "Bb Dorian", "Eb Mixolydian", "G Locrian", "Db Lydian"],
-    ["A Major", "Gb Minor", "Db Phrygian", "B Dorian", "E Mixolydian", "Ab Locrian", "D Lydian"],
-    ["Bb Major", "G Minor", "D Phrygian", "C Dorian", "F Mixolydian", "A Locrian", "Eb Lydian"],
-    ["B Major", "Ab Minor", "Eb Phrygian", "Db Dorian", "Gb Mixolydian", "Bb Locrian", "E Lydian"],
-]
+# Pitch classes, modes and key names are shared with semitone_calculator via music_keys
+key_map = SHARP_PITCH_CLASSES
+mode_intervals = MODE_INTERVALS
 
-relative_keys = {}
-for group in relative_key_groups:
-    for key in group:
-        relative_keys[key] = [k for k in group if k != key]
+# Relative keys by flat spelling ("C Major" -> ["D Dorian", "E Phrygian", ...])
+relative_keys = {key.flat_name: [r.flat_name for r in key.relatives()] for key in Key.all()}
 
+# Built-in song pools and tolerances. Once the slopgen_songs table (sql/slopgen_songs.sql)
+# has rows it replaces these at cog load and on /reload_songs.
 list1 = [
     ("Creo - Atmosphere", 128, "F#m"), 
     ("dj-Nate - Clubstep", 128, "Em"), 
@@ -179,7 +156,45 @@ custom_bpm_diff = {
     "2hollis - Poster Boy": (7, 10),
 }
 
+# --- Key engine ---
+# Keys are parsed once and cached. Each parsed key also gets a pitch-class bitmask at
+# quarter-tone resolution (bit 4*n is note n), so transposing is a bit rotation and
+# "does this shift turn key 2 into key 1" is a mask compare.
+QUARTER_TONES = 48
+_FULL_MASK = (1 << QUARTER_TONES) - 1
+
+mode_parent = {
+    "Dorian": "Minor",
+    "Phrygian": "Minor",
+    "Aeolian": "Minor",
+    "Locrian": "Minor",
+    "Minor": "Minor",
+    "Major": "Major",
+    "Lydian": "Major",
+    "Mixolydian": "Major",
+}
+
+def _quarters(value):
+    """value in quarter tones, or None if it isn't on the quarter-tone grid."""
+    q = value * 4
+    return int(q) if q == int(q) else None
+
+def _rotate(mask, steps):
+    """Transpose a pitch-class mask up by steps quarter tones."""
+    steps %= QUARTER_TONES
+    return ((mask << steps) | (mask >> (QUARTER_TONES - steps))) & _FULL_MASK
+
+def _canonical(mask):
+    """(canon, offset, period) with mask == _rotate(canon, offset); period is the mask's rotational symmetry."""
+    rotations = [_rotate(mask, -steps) for steps in range(QUARTER_TONES)]
+    canon = min(rotations)
+    offset = rotations.index(canon)
+    period = next(steps for steps in range(1, QUARTER_TONES + 1) if _rotate(mask, steps) == mask)
+    return canon, offset, period
+
+@functools.lru_cache(maxsize=None)
 def parse_key(key_str):
+    """(semitone, mode, note_set, normalized name) for a key like "F#m" or "C Dorian+0.5". Cached."""
     if not key_str:
         return None, None, None, ""
     micro = 0
@@ -197,9 +212,42 @@ def parse_key(key_str):
         return None, None, None, key_str
     semitone += micro
     intervals = mode_intervals.get(mode, mode_intervals["Major"])
-    note_set = sorted(((semitone + i) % 12 for i in intervals))
+    note_set = tuple(sorted(((semitone + i) % 12 for i in intervals)))
     return semitone, mode, note_set, f"{root} {mode}".strip()
 
+@functools.lru_cache(maxsize=None)
+def key_profile(key_str):
+    """Everything key_compatible needs about one key, computed once per key string.
+
+    Returns (semitone, notes, norm, root, parent_mode, relatives, shape) where relatives
+    are the normalized relative keys and shape is _canonical() of the note mask (None
+    when the key is off the quarter-tone grid).
+    """
+    semitone, mode, notes, norm = parse_key(key_str)
+    if semitone is None:
+        return None, None, norm, "", "", frozenset(), None
+    parts = norm.split()
+    root = parts[0] if parts else ""
+    nmode = parts[1] if len(parts) > 1 else ""
+    nmode = {"m": "Minor", "Ionian": "Major"}.get(nmode, nmode)
+    relatives = frozenset(normalize_key(r) for r in relative_keys.get(norm, []))
+    shape = None
+    q = _quarters(semitone)
+    if q is not None:
+        mask = 0
+        for i in mode_intervals.get(mode, mode_intervals["Major"]):
+            mask |= 1 << ((q + 4 * i) % QUARTER_TONES)
+        shape = _canonical(mask)
+    return semitone, notes, norm, root, nmode, relatives, shape
+
+def index_diff_from_semitonecalculator(n1, n2):
+    """semitone_calculator's diff for two keys of the same mode in its key table (enharmonic-aware)."""
+    key1 = table_key(n1)
+    key2 = table_key(n2)
+    if key1 is None or key2 is None or key1.mode != key2.mode:
+        return None
+    return float(key1.semitones_to(key2))
+
 def semitone_distance(s1, s2):
     diff = s2 - s1
     if diff > 6:
@@ -208,36 +256,39 @@ def semitone_distance(s1, s2):
         diff += 12
     return diff
 
-def key_compatible(k1, k2, song1=None):
-    def normalize_mode(mode):
-        if mode == "m":
-            return "Minor"
-        if mode == "Ionian":
-            return "Major"
-        return mode
-
-    # Try parse_key first
-    s1, mode1, notes1, norm1 = parse_key(k1)
-    s2, mode2, notes2, norm2 = parse_key(k2)
-
-    # Helper: index-based diff using semitone_calculator normalized_keys (enharmonic-aware)
-    def index_diff_from_semitonecalculator(n1, n2):
-        try:
-            nk1 = normalize_key(n1)
-            nk2 = normalize_key(n2)
-        except Exception:
-            return None
-        for mode in normalized_keys:
-            if nk1 in mode and nk2 in mode:
-                i1 = mode.index(nk1)
-                i2 = mode.index(nk2)
-                diff = i2 - i1
-                if diff > 6:
-                    diff -= 12
-                elif diff < -6:
-                    diff += 12
-                return float(diff)
+def lowest_shift(shape1, shape2, max_down, max_up):
+    """Lowest shift in [-max_down, max_up] (quarter-tone steps) that turns key 2 into key 1, or None."""
+    canon1, offset1, period = shape1
+    canon2, offset2, _ = shape2
+    if canon1 != canon2:
         return None
+    low = -max_down * 4
+    steps = low + (offset1 - offset2 - low) % period
+    if steps / 4 > max_up:
+        return None
+    # Same value (and int/float type) the old 0.25-step scan would have produced
+    return -max_down if steps == low else steps / 4
+
+def _scan_shifts(notes1, notes2, max_down, max_up):
+    """Step through shifts 0.25 at a time; only for keys or tolerances off the quarter-tone grid."""
+    val = -max_down
+    while val <= max_up:
+        if tuple(sorted(((n + val) % 12 for n in notes2))) == notes1:
+            return val
+        val += 0.25
+    return None
+
+DEFAULT_SEMITONE_DIFF = (2, 2)  # (max_down, max_up) when a song has no custom_semitone_diff entry
+
+def semitone_tolerance(song1):
+    max_down, max_up = custom_semitone_diff.get(str(song1), DEFAULT_SEMITONE_DIFF)
+    if max_down is None: max_down = DEFAULT_SEMITONE_DIFF[0]
+    if max_up is None: max_up = DEFAULT_SEMITONE_DIFF[1]
+    return max_down, max_up
+
+def key_compatible(k1, k2, song1=None):
+    s1, notes1, norm1, root1, nmode1, relatives1, shape1 = key_profile(k1)
+    s2, notes2, norm2, root2, nmode2, _, shape2 = key_profile(k2)
 
     # If parse failed for either, try index-based fallback
     if s1 is None or s2 is None:
@@ -250,57 +301,22 @@ def key_compatible(k1, k2, song1=None):
     relationship_candidates = []
 
     # Relative keys (compare normalized names)
-    if normalize_key(norm2) in [normalize_key(r) for r in relative_keys.get(norm1, [])]:
+    if normalize_key(norm2) in relatives1:
         relationship_candidates.append(('relative', semitone_distance(s1, s2)))
 
-    # Parent key logic
-    mode_parent = {
-        "Dorian": "Minor",
-        "Phrygian": "Minor",
-        "Aeolian": "Minor",
-        "Locrian": "Minor",
-        "Minor": "Minor",     
-        "Major": "Major",    
-        "Lydian": "Major",
-        "Mixolydian": "Major",
-    }
-    def extract_root_and_mode(norm):
-        parts = norm.split()
-        if not parts:
-            return "", ""
-        root = parts[0]
-        mode = parts[1] if len(parts) > 1 else ""
-        return root, normalize_mode(mode)
-    root1, nmode1 = extract_root_and_mode(norm1)
-    root2, nmode2 = extract_root_and_mode(norm2)
-
-    def is_parent_pair(root1, mode1, root2, mode2):
-        if root1 != root2:
-            return False
-        if mode1 in mode_parent and mode2 in mode_parent:
-            if (mode_parent[mode1] == mode2 and mode1 != mode2) or (mode_parent[mode2] == mode1 and mode1 != mode2):
-                return True
-        return False
-
-    if is_parent_pair(root1, nmode1, root2, nmode2):
-        relationship_candidates.append(('parent', semitone_distance(s1, s2)))
+    # Parent key logic: same root, one mode is the other's parent quality
+    if root1 == root2 and nmode1 != nmode2 and nmode1 in mode_parent and nmode2 in mode_parent:
+        if mode_parent[nmode1] == nmode2 or mode_parent[nmode2] == nmode1:
+            relationship_candidates.append(('parent', semitone_distance(s1, s2)))
 
     # Custom semitone shift logic (respects your custom_semitone_diff map)
-    max_down, max_up = custom_semitone_diff.get(str(song1), (2, 2))
-    if max_down is None: max_down = 2
-    if max_up is None: max_up = 2
-    step = 0.25
-    shifts = []
-    val = -max_down
-    while val <= max_up:
-        shifts.append(val)
-        val += step
-    for shift in shifts:
-        if notes2 is not None:
-            shifted_notes2 = sorted(((n + shift) % 12 for n in notes2))
-            if shifted_notes2 == notes1:
-                relationship_candidates.append(('custom', shift))
-                break
+    max_down, max_up = semitone_tolerance(song1)
+    if shape1 is not None and shape2 is not None and _quarters(max_down) is not None:
+        shift = lowest_shift(shape1, shape2, max_down, max_up)
+    else:
+        shift = _scan_shifts(notes1, notes2, max_down, max_up)
+    if shift is not None:
+        relationship_candidates.append(('custom', shift))
 
     # Add semitone_calculator index-based candidate (enharmonic-aware) if available
     idx = index_diff_from_semitonecalculator(norm1, norm2)
@@ -315,53 +331,568 @@ def key_compatible(k1, k2, song1=None):
     # If nothing matches, return original semitone_distance (float), preserving micro offsets
     return False, semitone_distance(s1, s2)
 
+DEFAULT_BPM_DIFF = (7.44, 10.76)  # (max_down, max_up) when a song has no custom_bpm_diff entry
+
+def bpm_tolerance(song2):
+    max_down, max_up = custom_bpm_diff.get(str(song2), DEFAULT_BPM_DIFF)
+    if max_down is None: max_down = DEFAULT_BPM_DIFF[0]
+    if max_up is None: max_up = DEFAULT_BPM_DIFF[1]
+    return max_down, max_up
+
 def bpm_ok(bpm1, bpm2, song2=None):
-    max_down, max_up = custom_bpm_diff.get(str(song2), (7.44, 10.76))
+    max_down, max_up = bpm_tolerance(song2)
     for b in [bpm1, bpm1/2, bpm1*2]:
         change = b - bpm2
         if (0 <= change <= max_up) or (-max_down <= change < 0):
             return True
     return False
 
-def generate_pairs(num_pairs=5):
-    pairs = []
-    used = set()
-    attempts = 0
-    while len(pairs) < num_pairs and attempts < 1000:
-        attempts += 1
-        a = random.choice(list1)
-        b = random.choice(list2)
-        if (a[0], b[0]) in banned_combos:
-            continue
-        if not DEBUG_IGNORE_KEY_RULES:
-            key_ok, semitone_diff = key_compatible(a[2], b[2], a[0])
-            if key_ok is None:
-                if DEBUG:
-                    print(f"Skipping key check for {a[0]} or {b[0]} (no key)")
-                key_ok = True
-                semitone_diff = 0
-        else:
+# --- Precomputed compatibility table ---
+def check_pair(a, b):
+    """Return the table row for songs a (list1) x b (list2), or None if they don't fit."""
+    if not DEBUG_IGNORE_KEY_RULES:
+        key_ok, semitone_diff = key_compatible(a[2], b[2], a[0])
+        if key_ok is None:  # unknown key
+            if DEBUG:
+                print(f"Skipping key check for {a[0]} or {b[0]} (no key)")
             key_ok, semitone_diff = True, 0
-        bpm_okay = bpm_ok(a[1], b[1], b[0]) if not DEBUG_IGNORE_BPM_RULES else True
-        if (a[0], b[0]) not in used and key_ok and bpm_okay:
-            used.add((a[0], b[0]))
-            _, _, _, norm_a = parse_key(a[2])
-            _, _, _, norm_b = parse_key(b[2])
-            pairs.append((a[0], a[1], norm_a, b[0], b[1], norm_b, semitone_diff))
-        if DEBUG_SHOW_ALL_ATTEMPTS:
-            print(f"Attempt {attempts}: {a[0]} x {b[0]} | Key OK: {key_ok} | BPM OK: {bpm_okay}")
-    return pairs
+    else:
+        key_ok, semitone_diff = True, 0
+    bpm_okay = bpm_ok(a[1], b[1], b[0]) if not DEBUG_IGNORE_BPM_RULES else True
+    if DEBUG_SHOW_ALL_ATTEMPTS:
+        print(f"{a[0]} x {b[0]} | Key OK: {key_ok} | BPM OK: {bpm_okay}")
+    if not (key_ok and bpm_okay):
+        return None
+    _, _, _, norm_a = parse_key(a[2])
+    _, _, _, norm_b = parse_key(b[2])
+    return (a[0], a[1], norm_a, b[0], b[1], norm_b, semitone_diff)
+
+
+# --- Pair quality score ---
+# 100 is a perfect fit (same key, same tempo). Every semitone of shift and every percent
+# of tempo change costs points, and pairs that only fit by using most of a song's
+# custom tolerance window lose up to EDGE_PENALTY more.
+SEMITONE_PENALTY = 8
+TEMPO_PENALTY = 2  # per percent of tempo change
+EDGE_PENALTY = 15
+EDGE_START = 0.75  # fraction of a tolerance window after which the edge penalty kicks in
+UNKNOWN_KEY_PENALTY = 20  # pairs that only passed because a key is missing
+
+def _window_use(change, max_down, max_up):
+    """How much of a (max_down, max_up) window a change uses, 0..1."""
+    room = max_up if change > 0 else max_down
+    if not room:
+        return 1.0 if change else 0.0
+    return min(abs(change) / room, 1.0)
+
+def pair_score(row):
+    """Quality score for a PairTable row; higher is better."""
+    a, bpm_a, key_a, b, bpm_b, key_b, semitone_diff = row
+    # Same half/double-time choice bpm_ok makes: the version of bpm_a closest to bpm_b
+    tempo_change = min((x - bpm_b for x in (bpm_a, bpm_a / 2, bpm_a * 2)), key=abs)
+    tempo_pct = abs(tempo_change) / bpm_b * 100 if bpm_b else 0
+    # Both windows are (max_down, max_up) around the shift/tempo change check_pair accepted
+    edge = max(
+        _window_use(semitone_diff, *semitone_tolerance(a)),
+        _window_use(tempo_change, *bpm_tolerance(b)),
+    )
+    edge = max(edge - EDGE_START, 0) / (1 - EDGE_START)
+    score = 100 - SEMITONE_PENALTY * abs(semitone_diff) - TEMPO_PENALTY * tempo_pct - EDGE_PENALTY * edge
+    if not key_a or not key_b:
+        score -= UNKNOWN_KEY_PENALTY
+    return round(score, 1)
+
+
+class PairTable:
+    """Every compatible list1 x list2 pair, checked once when the song lists load.
+
+    Excluded (banned) pairs are swapped out of the pick list, so picking stays O(1)
+    per pair no matter how many combos are banned. When a song is added or edited
+    only its row (list1) or column (list2) is rechecked, along with those pairs' scores.
+    """
+
+    def __init__(self, songs1, songs2):
+        self._songs = {1: {a[0]: a for a in songs1}, 2: {b[0]: b for b in songs2}}
+        self._available = []  # rows that can currently be picked
+        self._index = {}  # (song1, song2) -> position in _available
+        self._excluded = {}  # (song1, song2) -> compatible row held back by exclude()
+        self._banned = set()  # every excluded combo, compatible or not
+        self._scores = {}  # (song1, song2) -> pair_score of the row
+        self.version = 0  # bumped on every change, so derived data (the mega graph) knows to rebuild
+        for a in songs1:
+            for b in songs2:
+                self._put(check_pair(a, b))
+
+    def __len__(self):
+        return len(self._available)
+
+    def __contains__(self, combo):
+        return combo in self._index or combo in self._excluded
+
+    def _put(self, row):
+        if row is None:
+            return
+        combo = (row[0], row[3])
+        self._scores[combo] = pair_score(row)
+        if combo in self._banned:
+            self._excluded[combo] = row
+        else:
+            self._index[combo] = len(self._available)
+            self._available.append(row)
+
+    def _take(self, combo):
+        """Remove a pair from the pick list and return its row (None if it isn't there)."""
+        pos = self._index.pop(combo, None)
+        if pos is None:
+            return None
+        row = self._available[pos]
+        last = self._available.pop()
+        if pos < len(self._available):
+            self._available[pos] = last
+            self._index[(last[0], last[3])] = pos
+        return row
+
+    def _drop(self, combo):
+        if self._take(combo) is None:
+            self._excluded.pop(combo, None)
+        self._scores.pop(combo, None)
+
+    def exclude(self, song1, song2):
+        """Keep a pair out of the pick list, now and after any recompute."""
+        self.version += 1
+        self._banned.add((song1, song2))
+        row = self._take((song1, song2))
+        if row is not None:
+            self._excluded[(song1, song2)] = row
+
+    def include(self, song1, song2):
+        """Put an excluded pair back into the pick list."""
+        self.version += 1
+        self._banned.discard((song1, song2))
+        row = self._excluded.pop((song1, song2), None)
+        if row is not None:
+            self._put(row)
+
+    def set_excluded(self, combos):
+        """Make the excluded pairs match combos, touching only the pairs that changed."""
+        combos = set(combos)
+        for combo in self._banned - combos:
+            self.include(*combo)
+        for combo in combos - self._banned:
+            self.exclude(*combo)
+
+    def set_song(self, pool, song):
+        """Add or replace a song (title, bpm, key) in pool 1 or 2 and recheck only its pairs."""
+        self.remove_song(pool, song[0])
+        self.version += 1
+        self._songs[pool][song[0]] = song
+        if pool == 1:
+            for b in self._songs[2].values():
+                self._put(check_pair(song, b))
+        else:
+            for a in self._songs[1].values():
+                self._put(check_pair(a, song))
+
+    def remove_song(self, pool, title):
+        if self._songs[pool].pop(title, None) is None:
+            return
+        self.version += 1
+        if pool == 1:
+            for b in self._songs[2]:
+                self._drop((title, b))
+        else:
+            for a in self._songs[1]:
+                self._drop((a, title))
+
+    def songs(self, pool):
+        return list(self._songs[pool].values())
+
+    def available(self, song1, song2):
+        """Whether the pair is compatible and not banned."""
+        return (song1, song2) in self._index
+
+    def snapshot(self):
+        """(version, pool 1 songs, pool 2 songs, available (song1, song2) titles), safe to hand to a thread."""
+        return self.version, self.songs(1), self.songs(2), frozenset(self._index)
+
+    def pick(self, num_pairs=1):
+        """Up to num_pairs distinct pairs, uniformly at random."""
+        return random.sample(self._available, min(num_pairs, len(self._available)))
+
+    def score(self, row):
+        return self._scores[(row[0], row[3])]
+
+    def best(self, num_pairs=1):
+        """The num_pairs highest-scoring pairs, best first."""
+        return heapq.nlargest(num_pairs, self._available, key=lambda row: (self.score(row), row[0], row[3]))
+
+
+pair_table = PairTable(list1, list2)
+
+# --- Mega mashups ---
+MEGA_SEARCH_BUDGET = 1.5  # seconds a clique search may run before returning what it found
+
+_link_cache = {}
+
+def _linked(a, b):
+    """Same-pool compatibility: check_pair passes with either song as the base. Cached."""
+    cache_key = (a, b, semitone_tolerance(a[0]), bpm_tolerance(a[0]), semitone_tolerance(b[0]), bpm_tolerance(b[0]))
+    linked = _link_cache.get(cache_key)
+    if linked is None:
+        linked = check_pair(a, b) is not None or check_pair(b, a) is not None
+        _link_cache[cache_key] = linked
+    return linked
+
+
+class MashupGraph:
+    """Compatibility graph over both song pools, with one adjacency bitset per song.
+
+    list1 x list2 edges are the unbanned pairs in the pair table; songs from the same
+    pool are linked by _linked(). A mega mashup is a clique in this graph.
+    Built from a PairTable.snapshot() so the O(n²) build can run off the event loop.
+    """
+
+    def __init__(self, version, songs1, songs2, available):
+        self.version = version
+        self.songs = songs1 + songs2
+        self.adj = [0] * len(self.songs)
+        split = len(songs1)
+        for i, a in enumerate(self.songs):
+            for j in range(i + 1, len(self.songs)):
+                b = self.songs[j]
+                if a[0] == b[0]:
+                    continue
+                if i < split <= j:
+                    linked = (a[0], b[0]) in available
+                else:
+                    linked = _linked(a, b)
+                if linked:
+                    self.adj[i] |= 1 << j
+                    self.adj[j] |= 1 << i
+
+    def cliques(self, size, count, budget=MEGA_SEARCH_BUDGET):
+        """Up to count distinct random sets of size mutually compatible songs.
+
+        Runs passes over the songs in random order; each start song contributes at most
+        one new set per pass, found by a randomized depth-first search that only keeps
+        candidates adjacent to every song picked so far and backs out as soon as too few
+        are left. Stops when a pass finds nothing new or the time budget runs out.
+        """
+        deadline = time.monotonic() + budget
+        found = []
+        seen = set()
+
+        def extend(clique, candidates):
+            if len(clique) == size:
+                return None if frozenset(clique) in seen else clique
+            if candidates.bit_count() < size - len(clique) or time.monotonic() > deadline:
+                return None
+            picks = [v for v in range(candidates.bit_length()) if candidates >> v & 1]
+            random.shuffle(picks)
+            for v in picks:
+                result = extend(clique + [v], candidates & self.adj[v])
+                if result is not None:
+                    return result
+                candidates &= ~(1 << v)
+                if candidates.bit_count() < size - len(clique):
+                    break
+            return None
+
+        order = list(range(len(self.songs)))
+        progress = True
+        while progress and len(found) < count and time.monotonic() <= deadline:
+            progress = False
+            random.shuffle(order)
+            for start in order:
+                if len(found) >= count or time.monotonic() > deadline:
+                    break
+                clique = extend([start], self.adj[start])
+                if clique is not None:
+                    seen.add(frozenset(clique))
+                    found.append([self.songs[v] for v in clique])
+                    progress = True
+        return found
+
+
+_mega_graph = None
+
+async def mashup_graph() -> MashupGraph:
+    """The mega mashup graph, rebuilt in a worker thread when the pair table has changed since the last build."""
+    global _mega_graph
+    if _mega_graph is None or _mega_graph.version != pair_table.version:
+        _mega_graph = await asyncio.to_thread(MashupGraph, *pair_table.snapshot())
+    return _mega_graph
+
+def format_mega(songs):
+    return " + ".join(f"{title} ({bpm} BPM, {parse_key(key)[3]})" for title, bpm, key in songs)
+
+
+# --- Song pools (slopgen_songs table) ---
+SONG_TABLE = "slopgen_songs"
+
+def clean_bpm(value):
+    """BPM from the database as a number (128.0 -> 128), or None if it isn't one."""
+    try:
+        bpm = float(value)
+    except (TypeError, ValueError):
+        return None
+    return int(bpm) if bpm.is_integer() else bpm
+
+async def fetch_song_pools(db):
+    """Read slopgen_songs as {pool: {title: ((title, bpm, key), tolerance or None)}}."""
+    pools = {1: {}, 2: {}}
+    for row in await db.select(SONG_TABLE):
+        bpm = clean_bpm(row["bpm"])
+        tolerance = (row.get("tolerance_down"), row.get("tolerance_up"))
+        if tolerance == (None, None):
+            tolerance = None
+        pools[row["pool"]][row["title"]] = ((row["title"], bpm, row["key"]), tolerance)
+    return pools
+
+def apply_song_pools(pools):
+    """Bring list1/list2 and the tolerance maps in line with pools.
+
+    Only songs that were added, removed or edited get their pairs rechecked.
+    Returns how many songs changed.
+    """
+    changed = 0
+    for pool, songs, tolerances in ((1, list1, custom_semitone_diff), (2, list2, custom_bpm_diff)):
+        new = pools[pool]
+        current = {song[0]: song for song in songs}
+        for title in current.keys() - new.keys():
+            pair_table.remove_song(pool, title)
+            tolerances.pop(title, None)
+            changed += 1
+        for title, (song, tolerance) in new.items():
+            if current.get(title) == song and tolerances.get(title) == tolerance:
+                continue
+            # check_pair reads the tolerance maps, so update them before rechecking
+            if tolerance is None:
+                tolerances.pop(title, None)
+            else:
+                tolerances[title] = tolerance
+            pair_table.set_song(pool, song)
+            changed += 1
+        songs[:] = [song for song, _ in new.values()]
+    return changed
 
 # --- Supabase banned combos helpers ---
-async def fetch_banned_combos():
-    res = supabase.table("banned_combos").select("*").execute()
-    return {(row["song1"], row["song2"]) for row in res.data}
+async def fetch_banned_combos(db):
+    rows = await db.select("banned_combos")
+    return {(row["song1"], row["song2"]) for row in rows}
+
+async def add_banned_combo(db, song1, song2):
+    await db.execute(db.table("banned_combos").insert({"song1": song1, "song2": song2}))
+
+async def remove_banned_combo(db, song1, song2):
+    await db.execute(db.table("banned_combos").delete().eq("song1", song1).eq("song2", song2))
+
+
+class BannedCombos:
+    """In-memory copy of banned_combos, kept in step with the pair table.
+
+    Loaded once and then updated directly by add()/remove(); refresh() re-reads the
+    table so bans made by other instances show up too.
+    """
+
+    def __init__(self, db, table: PairTable):
+        self.db = db
+        self.table = table
+        self.combos = set()
+        self.loaded = False
+        self._version = 0  # bumped on every local change
+
+    def __contains__(self, combo):
+        return combo in self.combos
+
+    async def refresh(self):
+        version = self._version
+        combos = await fetch_banned_combos(self.db)
+        if version != self._version:
+            # A local add/remove landed while we were reading; the next refresh will catch up
+            return
+        self.combos = combos
+        self.table.set_excluded(combos)
+        self.loaded = True
+
+    async def add(self, song1, song2):
+        await add_banned_combo(self.db, song1, song2)
+        self._version += 1
+        self.combos.add((song1, song2))
+        self.table.exclude(song1, song2)
+
+    async def remove(self, song1, song2):
+        await remove_banned_combo(self.db, song1, song2)
+        self._version += 1
+        self.combos.discard((song1, song2))
+        self.table.include(song1, song2)
+
+
+# --- Catalog partner search ---
+BPM_EPSILON = 1e-9  # widen the bisect windows a hair; check_pair makes the final call
+class PartnerIndex:
+    """Find_Key's catalog grouped by key string, each group sorted by BPM.
+
+    /partners checks key_compatible once per distinct key (cached per query key), then
+    bisects the BPM windows of the groups that pass, so a lookup only touches songs
+    that can actually fit. Songs without a key or BPM are left out.
+
+    Entries are (title, bpm, key, song name). Songs with BPM/key changes get one entry
+    per distinct section, titled "name @ m:ss", so a song matches if any section fits.
+    """
+
+    def __init__(self, songs=()):
+        groups = {}
+        for entry in songs:
+            groups.setdefault(entry[2], []).append(entry)
+        self._groups = {}  # key -> (sorted bpms, entries in the same order)
+        for key, entries in groups.items():
+            entries.sort(key=lambda entry: (entry[1], entry[0]))
+            self._groups[key] = ([entry[1] for entry in entries], entries)
+        self._size = sum(len(bpms) for bpms, _ in self._groups.values())
+        self._key_cache = {}
+
+    @classmethod
+    def from_catalog(cls, data):
+        songs = []
+        for name, info in data.items():
+            timeline = info.get("timeline") or Timeline.from_song(info)
+            seen = set()
+            for section in timeline:
+                bpm = clean_bpm(section.bpm)
+                key = (section.key or "").strip()
+                if bpm is None or bpm <= 0 or not key or (bpm, key) in seen:
+                    continue
+                seen.add((bpm, key))
+                title = name if section.start == 0 else f"{name} @ {format_timestamp(section.start)}"
+                songs.append((title, bpm, key, name))
+        return cls(songs)
+
+    def __len__(self):
+        return self._size
+
+    def _keys_for(self, song):
+        """The catalog key groups whose key passes key_compatible against song's key."""
+        if DEBUG_IGNORE_KEY_RULES:
+            return list(self._groups)
+        tolerance = custom_semitone_diff.get(str(song[0]))
+        cache_key = (song[2], tolerance)
+        keys = self._key_cache.get(cache_key)
+        if keys is None:
+            # None means "unknown key", which check_pair lets through as well
+            keys = [key for key in self._groups if key_compatible(song[2], key, song[0])[0] is not False]
+            self._key_cache[cache_key] = keys
+        return keys
+
+    def partners(self, song, exclude=None):
+        """check_pair rows for every catalog song (section) that fits song (title, bpm, key), closest shift first.
+
+        Entries of the song named exclude (default: song's title) are skipped.
+        """
+        bpm = song[1]
+        exclude = song[0] if exclude is None else exclude
+        max_down, max_up = DEFAULT_BPM_DIFF
+        candidates = {}
+        for key in self._keys_for(song):
+            bpms, entries = self._groups[key]
+            if DEBUG_IGNORE_BPM_RULES:
+                candidates.update((entry[0], entry) for entry in entries)
+                continue
+            # bpm_ok accepts bpm2 within [b - max_up, b + max_down] for b in bpm, bpm/2, bpm*2
+            for b in (bpm, bpm / 2, bpm * 2):
+                lo = bisect_left(bpms, b - max_up - BPM_EPSILON)
+                hi = bisect_right(bpms, b + max_down + BPM_EPSILON)
+                candidates.update((entry[0], entry) for entry in entries[lo:hi])
+        rows = [
+            row for row in (check_pair(song, entry) for entry in candidates.values() if entry[3] != exclude)
+            if row is not None
+        ]
+        rows.sort(key=lambda row: (abs(row[6]), row[3]))
+        return rows
+
+
+# --- /gen output ---
+GEN_PAGE_SIZE = 5
+GEN_MAX_COUNT = 50
+
+def format_pair(row):
+    a, bpm_a, key_a, b, bpm_b, key_b, semitone_diff = row
+    semitone_count = abs(semitone_diff)
+    semitone_word = "semitone" if semitone_count == 1 else "semitones"
+    if semitone_diff > 0:
+        direction_key = "down"
+    elif semitone_diff < 0:
+        direction_key = "up"
+    else:
+        direction_key = "none"
+    return f"{a} ({bpm_a} BPM, {key_a}) x {b} ({bpm_b} BPM, {key_b}) → {semitone_count} {semitone_word} {direction_key}"
+
+def format_scored_pair(row):
+    return f"{format_pair(row)} (score {pair_table.score(row):g})"
+
+def truncate_output(output):
+    if len(output) > 1900:
+        output = output[:1900] + "\n...(truncated)..."
+    return output
+
+
+class GenPager(discord.ui.View):
+    """Pages through one /gen sample; the pairs are drawn once and only re-rendered per page."""
+
+    def __init__(self, pairs, owner_id: int, per_page: int = GEN_PAGE_SIZE, header: str = "", describe=format_pair):
+        super().__init__(timeout=300)
+        self.pairs = pairs
+        self.header = header
+        self.describe = describe
+        self.owner_id = owner_id
+        self.per_page = per_page
+        self.page = 0
+        self.pages = -(-len(pairs) // per_page)
+        self.message = None
+        self._sync_buttons()
 
-async def add_banned_combo(song1, song2):
-    supabase.table("banned_combos").insert({"song1": song1, "song2": song2}).execute()
+    def render(self) -> str:
+        start = self.page * self.per_page
+        lines = [self.header] if self.header else []
+        lines += [
+            f"{number}. {self.describe(row)}"
+            for number, row in enumerate(self.pairs[start:start + self.per_page], start=start + 1)
+        ]
+        lines.append(f"Page {self.page + 1}/{self.pages}")
+        return truncate_output("\n".join(lines))
 
-async def remove_banned_combo(song1, song2):
-    supabase.table("banned_combos").delete().eq("song1", song1).eq("song2", song2).execute()
+    def _sync_buttons(self):
+        self.previous_page.disabled = self.page == 0
+        self.next_page.disabled = self.page >= self.pages - 1
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.owner_id:
+            await interaction.response.send_message("Run /gen yourself to get your own ideas.", ephemeral=True)
+            return False
+        return True
+
+    async def _turn(self, interaction: discord.Interaction, step: int):
+        self.page = min(max(self.page + step, 0), self.pages - 1)
+        self._sync_buttons()
+        await interaction.response.edit_message(content=self.render(), view=self)
+
+    @discord.ui.button(label="Previous", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._turn(interaction, -1)
+
+    @discord.ui.button(label="Next", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._turn(interaction, 1)
+
+    async def on_timeout(self):
+        if self.message is None:
+            return
+        for item in self.children:
+            item.disabled = True
+        try:
+            await self.message.edit(view=self)
+        except discord.HTTPException:
+            pass
 
 
 # --- Role check ---
@@ -377,52 +908,150 @@ def has_jammer_role(interaction: discord.Interaction) -> bool:
 class SlopGenReal(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        self.banned = BannedCombos(bot.db, pair_table)
+        self._refresh_task = None
+        self.partner_index = PartnerIndex()
+        self._partner_version = None
 
-    async def generate_pairs(self, num_pairs=5):
-        banned_combos = await fetch_banned_combos()
-        pairs = []
-        used = set()
-        attempts = 0
-        while len(pairs) < num_pairs and attempts < 1000:
-            attempts += 1
-            a = random.choice(list1)
-            b = random.choice(list2)
-            if (a[0], b[0]) in banned_combos:
-                continue
-            # Key/BPM checks (same as before)
-            key_ok, semitone_diff = True, 0
-            bpm_okay = True
-            if not DEBUG_IGNORE_KEY_RULES:
-                key_ok, semitone_diff = key_compatible(a[2], b[2], a[0])
-                if key_ok is None:  # unknown key
-                    key_ok, semitone_diff = True, 0
-            if not DEBUG_IGNORE_BPM_RULES:
-                bpm_okay = bpm_ok(a[1], b[1], b[0])
-            if (a[0], b[0]) not in used and key_ok and bpm_okay:
-                used.add((a[0], b[0]))
-                _, _, _, norm_a = parse_key(a[2])
-                _, _, _, norm_b = parse_key(b[2])
-                pairs.append((a[0], a[1], norm_a, b[0], b[1], norm_b, semitone_diff))
-        return pairs
+    def _partner_index(self) -> PartnerIndex:
+        # Find_Key's catalog loads and refreshes in the background; rebuild when its version moves
+        if self._partner_version != song_catalog.version and catalog:
+            self.partner_index = PartnerIndex.from_catalog(catalog)
+            self._partner_version = song_catalog.version
+            logger.info("Partner index built: %d of %d catalog songs", len(self.partner_index), len(catalog))
+        return self.partner_index
+
+    async def cog_load(self):
+        song_catalog.start(self.bot.db)
+        try:
+            await self.reload_songs()
+        except Exception:
+            logger.exception("Failed to load song pools; using the built-in lists")
+        try:
+            await self.banned.refresh()
+        except Exception:
+            logger.exception("Failed to load banned combos; retrying in the background")
+        self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def cog_unload(self):
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(BANNED_REFRESH_INTERVAL if self.banned.loaded else 10)
+            try:
+                await self.banned.refresh()
+            except Exception:
+                logger.exception("Failed to refresh banned combos")
+
+    async def reload_songs(self) -> int:
+        """Re-read slopgen_songs and recompute the pairs of changed songs. Returns the change count."""
+        pools = await fetch_song_pools(self.bot.db)
+        if not pools[1] or not pools[2]:
+            logger.warning("%s has no songs for one of the pools; keeping the current lists", SONG_TABLE)
+            return 0
+        changed = apply_song_pools(pools)
+        logger.info("Song pools reloaded: %d songs changed, %d pairs available", changed, len(pair_table))
+        return changed
+
+    async def generate_pairs(self, num_pairs=5, best=False):
+        # Banned pairs are already excluded from the table; no database call here
+        if best:
+            return pair_table.best(num_pairs)
+        return pair_table.pick(num_pairs)
 
     @app_commands.command(name="gen", description="Generate a starboardslop mashup idea")
-    async def gen_slash(self, interaction: discord.Interaction):
-        pairs = await self.generate_pairs(1)
-        lines = []
-        for a, bpm_a, key_a, b, bpm_b, key_b, semitone_diff in pairs:
-            semitone_count = abs(semitone_diff)
-            semitone_word = "semitone" if semitone_count == 1 else "semitones"
-            if semitone_diff > 0:
-                direction_key = "down"
-            elif semitone_diff < 0:
-                direction_key = "up"
-            else:
-                direction_key = "none"
-            lines.append(f"{a} ({bpm_a} BPM, {key_a}) x {b} ({bpm_b} BPM, {key_b}) → {semitone_count} {semitone_word} {direction_key}")
-        output = "\n".join(lines)
-        if len(output) > 1900:
-            output = output[:1900] + "\n...(truncated)..."
-        await interaction.response.send_message(output)
+    @app_commands.describe(
+        count=f"How many distinct ideas to generate (paged {GEN_PAGE_SIZE} at a time)",
+        mode="random picks, the best-scoring pairs, or mega mashups",
+        size="Songs per mega mashup (mega mode only)",
+    )
+    @app_commands.choices(mode=[
+        app_commands.Choice(name="random", value="random"),
+        app_commands.Choice(name="best", value="best"),
+        app_commands.Choice(name="mega", value="mega"),
+    ])
+    async def gen_slash(self, interaction: discord.Interaction, count: app_commands.Range[int, 1, GEN_MAX_COUNT] = 1,
+                        mode: str = "random", size: app_commands.Range[int, 3, 4] = 3):
+        if mode == "mega":
+            await self.gen_mega(interaction, count, size)
+            return
+        best = mode == "best"
+        pairs = await self.generate_pairs(count, best=best)
+        if not pairs:
+            await interaction.response.send_message("No valid mashup pairs left, every compatible combo is banned.")
+            return
+        describe = format_scored_pair if best else format_pair
+        if len(pairs) <= GEN_PAGE_SIZE:
+            await interaction.response.send_message(truncate_output("\n".join(describe(row) for row in pairs)))
+            return
+        view = GenPager(pairs, interaction.user.id, describe=describe)
+        await interaction.response.send_message(view.render(), view=view)
+        view.message = await interaction.original_response()
+
+    async def gen_mega(self, interaction: discord.Interaction, count: int, size: int):
+        await interaction.response.defer()
+        graph = await mashup_graph()
+        # The search is pure CPU with its own time budget; keep it off the event loop
+        megas = await asyncio.to_thread(graph.cliques, size, count)
+        if not megas:
+            await interaction.followup.send(f"No {size} songs in the pools all fit together.")
+            return
+        if len(megas) <= GEN_PAGE_SIZE:
+            await interaction.followup.send(truncate_output("\n".join(format_mega(songs) for songs in megas)))
+            return
+        view = GenPager(megas, interaction.user.id, describe=format_mega)
+        view.message = await interaction.followup.send(view.render(), view=view, wait=True)
+
+    @app_commands.command(name="partners", description="Find every catalog song that mashes with a song")
+    @app_commands.describe(
+        song="Song from the catalog ('(Artist) - (Title)')",
+        at="Match the section playing at this timestamp (e.g. 1:12) instead of the headline BPM/key",
+    )
+    async def partners_slash(self, interaction: discord.Interaction, song: str, at: str = None):
+        if not song_catalog.loaded.is_set():
+            await interaction.response.send_message("⏳ The song catalog is still loading, try again in a few seconds.", ephemeral=True)
+            return
+        info = catalog.get(song)
+        if info is None:
+            suggestions = search_index().suggest(song, n=5)
+            hint = ("\nDid you mean: " + ", ".join(f"`{s}`" for s in suggestions) + "?") if suggestions else ""
+            await interaction.response.send_message(f"❌ `{song}` isn't in the song catalog.{hint}", ephemeral=True)
+            return
+        title, bpm, key = song, info.get("bpm"), info.get("key")
+        if at is not None:
+            seconds = parse_timestamp(at)
+            if seconds is None:
+                await interaction.response.send_message(f"❌ `{at}` isn't a timestamp (try `1:12`).", ephemeral=True)
+                return
+            section = (info.get("timeline") or Timeline.from_song(info)).at(seconds)
+            bpm, key = section.bpm, section.key
+            if section.start > 0:
+                title = f"{song} @ {format_timestamp(section.start)}"
+        bpm = clean_bpm(bpm)
+        key = (key or "").strip()
+        if bpm is None or bpm <= 0 or not key:
+            await interaction.response.send_message(f"❌ `{title}` has no BPM or key in the catalog.", ephemeral=True)
+            return
+        rows = self._partner_index().partners((title, bpm, key), exclude=song)
+        if not rows:
+            await interaction.response.send_message(f"No catalog songs fit {title} ({bpm} BPM, {key}).")
+            return
+        view = GenPager(rows, interaction.user.id, header=f"**{len(rows)} partners for {title}**")
+        if view.pages == 1:
+            await interaction.response.send_message(view.render())
+            return
+        await interaction.response.send_message(view.render(), view=view)
+        view.message = await interaction.original_response()
+
+    @partners_slash.autocomplete("song")
+    async def partners_autocomplete(self, interaction: discord.Interaction, current: str):
+        return [
+            app_commands.Choice(name=name, value=name)
+            for name in search_index().suggest(current, n=25)
+            if len(name) <= 100
+        ]
 
     @app_commands.command(name="add_ban", description="Ban a combo (Jammer role required)")
     @app_commands.describe(song1="Song from list1", song2="Song from list2")
@@ -435,11 +1064,10 @@ class SlopGenReal(commands.Cog):
         if song1 not in list1_titles or song2 not in list2_titles:
             await interaction.response.send_message("Invalid songs.", ephemeral=True)
             return
-        banned_combos = await fetch_banned_combos()
-        if (song1, song2) in banned_combos:
+        if (song1, song2) in self.banned:
             await interaction.response.send_message("Already banned.", ephemeral=True)
             return
-        await add_banned_combo(song1, song2)
+        await self.banned.add(song1, song2)
         await interaction.response.send_message(f"Banned {song1} x {song2}", ephemeral=True)
 
     @app_commands.command(name="remove_ban", description="Remove a banned combo (Jammer role required)")
@@ -448,13 +1076,29 @@ class SlopGenReal(commands.Cog):
         if not has_jammer_role(interaction):
             await interaction.response.send_message("No permission.", ephemeral=True)
             return
-        banned_combos = await fetch_banned_combos()
-        if (song1, song2) not in banned_combos:
+        if (song1, song2) not in self.banned:
             await interaction.response.send_message("Not banned.", ephemeral=True)
             return
-        await remove_banned_combo(song1, song2)
+        await self.banned.remove(song1, song2)
         await interaction.response.send_message(f"Removed ban: {song1} x {song2}", ephemeral=True)
 
+    @app_commands.command(name="reload_songs", description="Reload the /gen song pools (Jammer role required)")
+    async def reload_songs_slash(self, interaction: discord.Interaction):
+        if not has_jammer_role(interaction):
+            await interaction.response.send_message("No permission.", ephemeral=True)
+            return
+        await interaction.response.defer(ephemeral=True)
+        try:
+            changed = await self.reload_songs()
+        except Exception:
+            logger.exception("Failed to reload song pools")
+            await interaction.followup.send("Failed to reload the song pools.", ephemeral=True)
+            return
+        await interaction.followup.send(
+            f"Reloaded: {changed} songs changed, {len(list1)} x {len(list2)} songs, {len(pair_table)} pairs available.",
+            ephemeral=True,
+        )
+
     # --- Autocomplete handlers ---
     @add_ban.autocomplete('song1')
     async def song1_autocomplete(self, interaction: discord.Interaction, current: str):
@@ -1,59 +1,29 @@
-import os
 import discord
 from discord import app_commands
 from discord.ext import commands
 import random
 import asyncio
-import math
-from supabase import create_client, Client
-from dotenv import load_dotenv
 import time
 
 TEST_SERVER_ID = 1411767823730085971
 
-# ---------------------- SUPABASE INIT ----------------------
-load_dotenv()
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SERVICE_ROLE_KEY = os.getenv("SERVICE_ROLE_KEY")
-supabase: Client = create_client(SUPABASE_URL, SERVICE_ROLE_KEY)
-
 # ---------------------- DATA FETCHERS ----------------------
-def fetch_points():
-    """Load all user points from Supabase"""
-    res = supabase.table("points").select("*").execute()
-    points = {}
-    for row in res.data or []:
-        user_id = str(row["user_id"])
-        points[user_id] = {"name": row.get("name", "Unknown"), "points": row.get("points", 0)}
-    return points
-
-def save_points(points):
-    """Push updated points back to Supabase"""
-    payload = []
-    for user_id, info in points.items():
-        payload.append({
-            "user_id": user_id,
-            "name": info.get("name", "Unknown"),
-            "points": math.ceil(info.get("points", 0))
-        })
-    if payload:
-        supabase.table("points").upsert(payload, on_conflict="user_id").execute()
-
-def fetch_songdata(table_name: str):
+async def fetch_songdata(db, table_name: str):
     """Fetch song data from the specified Supabase table"""
-    res = supabase.table(table_name).select("*").execute()
     songs = {}
-    for row in res.data or []:
-        title = row.get("title")
-        if not title:
-            continue
-        songs[title] = {
-            "bpm": row.get("bpm"),
-            "key": row.get("key_signature"),
-            "author": row.get("author"),
-            "difficulty": row.get("difficulty") or "Unknown",
-            "changes": row.get("changes") or [],
-        }
+    # Paged, so tables bigger than the PostgREST row limit come back whole
+    async for rows in db.select_pages(table_name, "title, bpm, key_signature, author, difficulty, changes", key="id"):
+        for row in rows:
+            title = row.get("title")
+            if not title:
+                continue
+            songs[title] = {
+                "bpm": row.get("bpm"),
+                "key": row.get("key_signature"),
+                "author": row.get("author"),
+                "difficulty": row.get("difficulty") or "Unknown",
+                "changes": row.get("changes") or [],
+            }
     # optional debug:
     # print(f"Fetched {len(songs)} songs from {table_name}")
     return songs
@@ -63,13 +33,27 @@ class SongDataGuess(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.active_games = {}  # channel_id -> dict
-        self.points = fetch_points()
 
     async def _run_guess_game(self, interaction: discord.Interaction, table_name: str, label: str):
-        songdata = fetch_songdata(table_name)
+        channel_id = interaction.channel.id
+        if channel_id in self.active_games:
+            await interaction.response.send_message("Don't play multiple games at once!", ephemeral=True)
+            return
+
+        # Reserve the channel and acknowledge before paging the table, which can
+        # take longer than Discord's 3 second response window
+        self.active_games[channel_id] = {"answered": False}
+        try:
+            await interaction.response.defer(thinking=True)
+            await self._play_round(interaction, table_name, label)
+        finally:
+            self.active_games.pop(channel_id, None)
+
+    async def _play_round(self, interaction: discord.Interaction, table_name: str, label: str):
+        songdata = await fetch_songdata(self.bot.db, table_name)
         candidates = [s for s, v in songdata.items() if v.get("key") and v.get("bpm")]
         if not candidates:
-            await interaction.response.send_message(f"No songs with key and BPM info found in {label}.", ephemeral=True)
+            await interaction.followup.send(f"No songs with key and BPM info found in {label}.")
             return
 
         song = random.choice(candidates)
@@ -79,13 +63,8 @@ class SongDataGuess(commands.Cog):
         difficulty_val = songdata[song].get("difficulty", "Unknown")
 
         channel_id = interaction.channel.id
-        if channel_id in self.active_games:
-            await interaction.response.send_message("Don't play multiple games at once!", ephemeral=True)
-            return
-
-        # register active game
-        self.active_games[channel_id] = {"song": song, "key": key, "bpm": bpm, "answered": False}
-        await interaction.response.send_message(
+        self.active_games[channel_id].update({"song": song, "key": key, "bpm": bpm})
+        await interaction.followup.send(
             f"🎵 Guess the key and BPM for: **{author} - {song}**! Difficulty: **{difficulty_val}**\n"
             f"Type both the key and BPM in chat within 30 seconds."
         )
@@ -111,13 +90,9 @@ class SongDataGuess(commands.Cog):
             return None
 
         start_time = time.monotonic()
-        points = fetch_points()
 
         async def handle_message(msg: discord.Message):
-            # only consider messages in same channel and not from bots
-            if msg.channel.id != channel_id or msg.author.bot:
-                return
-
+            # the router only delivers non-bot messages from this channel
             content = msg.content.lower()
             guessed_bpm = extract_bpm(content)
             guessed_key = extract_key(content)
@@ -125,8 +100,6 @@ class SongDataGuess(commands.Cog):
                 return
 
             user_id = str(msg.author.id)
-            if user_id not in points:
-                points[user_id] = {"name": msg.author.name, "points": 0}
 
             correct_bpm = guessed_bpm == bpm
             correct_key = guessed_key == key
@@ -144,30 +117,28 @@ class SongDataGuess(commands.Cog):
                         await self.end_round(interaction, msg, song, key, bpm, difficulty_val, elapsed, table_name)
             else:
                 # penalize guesses that are invalid (optional)
-                points[user_id]["points"] -= 1
-                save_points(points)
+                await self.bot.ledger.adjust(user_id, -1, "songdata_wrong_guess", name=msg.author.name)
                 try:
                     await msg.add_reaction("❌")
                 except discord.Forbidden:
                     pass
 
-        # add listener, sleep for the round duration, then cleanup
-        self.bot.add_listener(handle_message, "on_message")
+        # route this channel to the handler, sleep for the round duration, then cleanup
+        route = self.bot.router.add(handle_message, channels={channel_id})
         try:
             await asyncio.sleep(30)
             if not self.active_games[channel_id]["answered"]:
                 await interaction.channel.send(f"⏰ Time's up! Correct answer: **Key: {key.upper()} | BPM: {bpm}**")
         finally:
-            self.bot.remove_listener(handle_message, "on_message")
-            self.active_games.pop(channel_id, None)
+            self.bot.router.remove(route)
 
     async def end_round(self, interaction: discord.Interaction, msg: discord.Message, song: str, key: str, bpm: str, difficulty_val, elapsed: float, table_name: str):
         # fetch stored difficulty, fallback to "easy"
         try:
-            response = supabase.table(table_name).select("difficulty").eq("title", song).execute()
+            rows = await self.bot.db.select(table_name, "difficulty", title=song)
             stored_difficulty = (
-                response.data[0]["difficulty"].lower().strip()
-                if response.data and response.data[0].get("difficulty")
+                rows[0]["difficulty"].lower().strip()
+                if rows and rows[0].get("difficulty")
                 else "easy"
             )
         except Exception as e:
@@ -177,13 +148,7 @@ class SongDataGuess(commands.Cog):
         max_points = {"easy": 15, "medium": 30, "hard": 45}.get(stored_difficulty, 15)
         points_awarded = max(1, round(max_points * ((30 - elapsed) / 30)))
 
-        points = fetch_points()
-        user_id = str(msg.author.id)
-        if user_id not in points:
-            points[user_id] = {"name": msg.author.name, "points": 0}
-
-        points[user_id]["points"] += points_awarded
-        save_points(points)
+        await self.bot.ledger.adjust(msg.author.id, points_awarded, "songdata_guess", name=msg.author.name)
 
         await interaction.channel.send(
             f"✅ Correct! {msg.author.mention} gets **{points_awarded} Slop Point(s)**!\n"
@@ -210,7 +175,8 @@ class SongDataGuess(commands.Cog):
             new_difficulty = "none"
 
         if new_difficulty != "none":
-            supabase.table(table_name).update({"difficulty": new_difficulty}).eq("title", song).execute()
+            db = self.bot.db
+            await db.execute(db.table(table_name).update({"difficulty": new_difficulty}).eq("title", song))
             await interaction.channel.send(f"✅ Difficulty updated to **{new_difficulty}** for **{song}**.")
         else:
             await interaction.channel.send("Difficulty change skipped.")
@@ -218,29 +184,10 @@ class SongDataGuess(commands.Cog):
     # ---------------- app commands (slash) ----------------
     @app_commands.command(name="guess_gdsong_key", description="Guess the key and BPM of a random GD song")
     async def guess_gdsong_key(self, interaction: discord.Interaction):
-        self.points = fetch_points()
-        user_id = str(interaction.user.id)
-
-        if random.randint(1, 1000) == 1:
-            self.points[user_id]["points"] += 5000
-            await interaction.response.send_message("You just won the slop lottery, you have received 5000 Slop Points")
-            save_points(self.points)
-            return
-        
-        # fetch points is internal to the cog methods if needed
         await self._run_guess_game(interaction, "gdsongdata", "GD songs")
 
     @app_commands.command(name="guess_non_gdsong_key", description="Guess the key and BPM of a random non-GD song")
     async def guess_non_gdsong_key(self, interaction: discord.Interaction):
-        self.points = fetch_points()
-        user_id = str(interaction.user.id)
-
-        if random.randint(1, 1000) == 1:
-            self.points[user_id]["points"] += 5000
-            await interaction.response.send_message("You just won the slop lottery, you have received 5000 Slop Points")
-            save_points(self.points)
-            return
-        
         await self._run_guess_game(interaction, "nongdsongdata", "Non-GD songs")
 
 # ---------------------- SETUP ----------------------
@@ -0,0 +1,483 @@
+"""Replay a synthetic message stream through every cog that listens to on_message.
+
+Loads the real cogs into an offline bot backed by LocalSupabase, fakes the
+Discord objects they touch, and reports per-listener and per-message latency,
+throughput and the Supabase / Discord calls the stream caused.
+
+    python benchmarks/bench_on_message.py --messages 5000 --db-latency 0.03
+    python benchmarks/bench_on_message.py --json results.json --fail-over-ms 5
+
+SlopGen.py starts the bot on import, so its own on_message can't be loaded here;
+its only work for non-"slop ping" messages is bot.process_commands(), which is
+measured as the "process_commands" listener.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import discord
+from discord.ext import commands
+
+from event_router import MessageRouter
+from local_supabase import LocalSupabase
+from slop_db import SlopDB
+from slop_points import PointsLedger
+
+# Cogs with an on_message listener, in SlopGen's load order
+ON_MESSAGE_COGS = [
+    "Imitate",
+    "leveling_cog",
+    "SongData_Guess",
+    "MakeSfhMoreLikeGdmToRagebaitShlant",
+    "butter",
+    "ReplaceOtherBots",
+    "scambanner",
+    "keyword_reactions",
+]
+
+MAIN_GUILD_ID = 899784386038333551
+GENERAL_CHANNEL_ID = 899784386038333555  # ReplaceOtherBots' AI / sticky channel
+SUBMISSIONS_CHANNEL_ID = 1079516597506551928  # attachment reactor channel
+GAME_CHANNEL_ID = 1400000000000000001
+BUTTER_USER_ID = 1339158762128146463
+BOT_USER_ID = 1400000000000000000
+
+CHATTER = [
+    "anyone know a good nong for this level",
+    "jukebox says web request failed -60 again",
+    "lol",
+    "how do i submit a song",
+    "this mashup goes hard",
+    "what key is this in",
+    "brb",
+    "the showcase field is confusing",
+]
+
+
+# --- Discord fakes ---
+# Only what the listeners touch. Every coroutine method is tallied in DISCORD_CALLS
+# and can sleep for an injected latency.
+DISCORD_CALLS = Counter()
+DISCORD_LATENCY = 0.0
+
+
+async def _discord_call(name: str):
+    DISCORD_CALLS[name] += 1
+    if DISCORD_LATENCY:
+        await asyncio.sleep(DISCORD_LATENCY)
+
+
+class FakeGuild:
+    def __init__(self, guild_id: int):
+        self.id = guild_id
+        self.name = f"guild-{guild_id}"
+
+
+class FakeChannel:
+    def __init__(self, channel_id: int, guild: FakeGuild):
+        self.id = channel_id
+        self.guild = guild
+        self._next_id = channel_id * 1000
+
+    async def send(self, *args, **kwargs):
+        await _discord_call("channel.send")
+        self._next_id += 1
+        return FakeMessage(self._next_id, "", BOT_MEMBER, self)
+
+    async def fetch_message(self, message_id: int):
+        await _discord_call("channel.fetch_message")
+        raise discord.NotFound(_FakeHTTPResponse(), "Unknown Message")
+
+
+class _FakeHTTPResponse:
+    status = 404
+    reason = "Not Found"
+
+
+class FakeMember(discord.Member):
+    # Member's fields are slots/properties backed by gateway state; plain class
+    # attributes here let instances carry their own values instead.
+    id = None
+    name = None
+    bot = False
+    guild = None
+    roles = ()
+    mention = ""
+
+    def __init__(self, member_id: int, name: str, bot: bool = False, roles=()):
+        self.id = member_id
+        self.name = name
+        self.bot = bot
+        self.roles = list(roles)
+        self.mention = f"<@{member_id}>"
+
+    def __str__(self):
+        return self.name
+
+    def __repr__(self):
+        return f"<FakeMember id={self.id} name={self.name!r}>"
+
+    def __eq__(self, other):
+        return getattr(other, "id", None) == self.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+    async def send(self, *args, **kwargs):
+        await _discord_call("member.send")
+
+    async def ban(self, *args, **kwargs):
+        await _discord_call("member.ban")
+
+
+class FakeAttachment:
+    def __init__(self, content_type: str):
+        self.content_type = content_type
+
+
+class FakeMessage:
+    _state = None  # the bot's ConnectionState, set by build_bot; commands.Context reads it
+
+    def __init__(self, message_id: int, content: str, author: FakeMember, channel: FakeChannel, attachments=()):
+        self.id = message_id
+        self.content = content
+        self.author = author
+        self.channel = channel
+        self.guild = channel.guild
+        self.attachments = list(attachments)
+        self.mentions = []
+        self.role_mentions = []
+        self.mention_everyone = False
+        self.reference = None
+        self.type = discord.MessageType.default
+
+    async def add_reaction(self, emoji):
+        await _discord_call("message.add_reaction")
+
+    async def reply(self, *args, **kwargs):
+        await _discord_call("message.reply")
+
+    async def delete(self, *args, **kwargs):
+        await _discord_call("message.delete")
+
+
+BOT_MEMBER = FakeMember(BOT_USER_ID, "SlopBot", bot=True)
+
+
+class FakeResponse:
+    async def send_message(self, *args, **kwargs):
+        await _discord_call("interaction.send_message")
+
+    async def defer(self, *args, **kwargs):
+        await _discord_call("interaction.defer")
+
+
+class FakeFollowup:
+    async def send(self, *args, **kwargs):
+        await _discord_call("followup.send")
+
+
+class FakeInteraction:
+    def __init__(self, channel: FakeChannel, user: FakeMember):
+        self.channel = channel
+        self.user = user
+        self.guild = channel.guild
+        self.guild_id = channel.guild.id
+        self.response = FakeResponse()
+        self.followup = FakeFollowup()
+
+
+class BenchContext(commands.Context):
+    """Sends through the fake channel instead of Discord's HTTP client."""
+
+    async def send(self, *args, **kwargs):
+        return await self.channel.send(*args, **kwargs)
+
+    async def reply(self, *args, **kwargs):
+        return await self.message.reply(*args, **kwargs)
+
+
+class BenchBot(commands.Bot):
+    """Offline bot: commands get a BenchContext and their errors are tallied rather than printed."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.command_errors = Counter()
+
+    async def get_context(self, origin, /, *, cls=BenchContext):
+        return await super().get_context(origin, cls=cls)
+
+    async def on_command_error(self, context, exception):
+        error = getattr(exception, "original", exception)
+        self.command_errors[f"{context.command}: {type(error).__name__}"] += 1
+
+
+# --- Fixtures ---
+def seed_database(client: LocalSupabase, users: int, rng: random.Random):
+    client.seed("points", [
+        {"user_id": str(1000 + i), "name": f"user{i}", "points": rng.randint(0, 500), "house_seen": 0}
+        for i in range(users)
+    ])
+    client.seed("imitations", [
+        {"name": name, "imitations": [f"{name} says hi", f"classic {name} moment"]}
+        for name in ("sergeant", "shlant", "margaryna", "gdm")
+    ])
+    client.seed("keyword_reactions", [
+        {"keyword": keyword, "emoji": emoji, "added_by": "0"}
+        for keyword, emoji in (("mashup", "🔥"), ("nong", "🎵"), ("lol", "😂"), ("butter", "🧈"))
+    ])
+    client.seed("miscinfo", [{"id": 3, "attribute": "butter", "count": 0}])
+    client.seed("gdsongdata", [
+        {"title": f"Song {i}", "author": f"Artist {i % 7}", "bpm": 120 + i, "key_signature": "C Major",
+         "difficulty": "easy", "changes": []}
+        for i in range(50)
+    ])
+
+
+def build_stream(count: int, users: int, rng: random.Random, channels: dict) -> list:
+    """Mixed traffic: chatter, keyword hits, submissions, image spam, game guesses, commands, bots."""
+    members = [FakeMember(1000 + i, f"user{i}") for i in range(users)]
+    butter = FakeMember(BUTTER_USER_ID, "margaryna")
+    other_bot = FakeMember(1500000000000000000, "OtherBot", bot=True)
+    messages = []
+    for i in range(count):
+        roll = rng.random()
+        author = rng.choice(members)
+        channel, content, attachments = channels["general"], rng.choice(CHATTER), ()
+        if roll < 0.10:
+            author = other_bot
+        elif roll < 0.15:
+            author = butter
+        elif roll < 0.25:
+            channel, attachments = channels["submissions"], [FakeAttachment("audio/mpeg")]
+        elif roll < 0.27:
+            attachments = [FakeAttachment("image/png")] * 4
+        elif roll < 0.40:
+            channel = channels["game"]
+            content = rng.choice(["sergeant", "shlant", "margaryna", "gdm", "c major 120", "d minor 133"])
+        elif roll < 0.45:
+            content = "slop sticky"
+        elif roll < 0.60:
+            channel = channels["other"]
+        messages.append(FakeMessage(10_000 + i, content, author, channel, attachments))
+    return messages
+
+
+# --- Harness ---
+async def build_bot(client: LocalSupabase):
+    intents = discord.Intents.default()
+    intents.message_content = True
+    intents.members = True
+    bot = BenchBot(command_prefix=commands.when_mentioned_or("slop "), intents=intents, case_insensitive=True)
+    # Offline bot: give it the running loop and an identity without logging in
+    bot.loop = asyncio.get_running_loop()
+    bot._connection.user = BOT_MEMBER
+    FakeMessage._state = bot._connection
+    bot.db = SlopDB(client)
+    bot.router = MessageRouter()
+    bot.ledger = PointsLedger(bot.db)
+    await bot.ledger.load()
+    bot.ledger.start()
+
+    loaded, failed = [], {}
+    for name in ON_MESSAGE_COGS:
+        try:
+            await bot.load_extension(name)
+            loaded.append(name)
+        except Exception as e:
+            failed[name] = f"{type(e).__name__}: {e}"
+
+    # Keep the Ollama worker from calling out; queued messages are simply left queued
+    replace = bot.get_cog("ReplaceOtherBots")
+    if replace is not None:
+        replace.worker_task.cancel()
+    return bot, loaded, failed
+
+
+def start_games(bot, channels: dict) -> list:
+    """Start one imitation game and one key-guess game so their handlers are routed."""
+    tasks = []
+    imitate = bot.get_cog("Imitate")
+    if imitate is not None and imitate.imitations:
+        keyword = next(iter(imitate.imitations))
+        imitate.active_game = {"keyword": keyword.lower(), "channel": channels["game"],
+                               "start_time": asyncio.get_running_loop().time()}
+        imitate._game_route = bot.router.add(imitate.on_message, channels={channels["game"].id})
+    guess = bot.get_cog("SongDataGuess")
+    if guess is not None:
+        interaction = FakeInteraction(channels["game"], FakeMember(999, "host"))
+        tasks.append(asyncio.create_task(guess._run_guess_game(interaction, "gdsongdata", "GD songs")))
+    return tasks
+
+
+def listener_name(func) -> str:
+    return getattr(func, "__qualname__", repr(func)).replace(".<locals>", "")
+
+
+async def run_stream(bot, messages: list, concurrency: int) -> tuple[dict, list, list, Counter]:
+    """Run every message through the router (plus any plain listeners) concurrently, as dispatch does."""
+    per_listener = defaultdict(list)
+    per_message = []
+    scheduled = []
+    errors = Counter()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def timed(name, coro):
+        start = time.perf_counter()
+        try:
+            await coro
+        except Exception as e:
+            errors[f"{name}: {type(e).__name__}"] += 1
+        per_listener[name].append(time.perf_counter() - start)
+
+    async def handle(message):
+        async with semaphore:
+            start = time.perf_counter()
+            handlers = [(route.name, route.handler) for route in bot.router.routes_for(message)]
+            handlers += [(listener_name(func), func) for func in bot.extra_events.get("on_message", [])]
+            scheduled.append(len(handlers))
+            await asyncio.gather(
+                timed("process_commands", bot.process_commands(message)),
+                *(timed(name, func(message)) for name, func in handlers),
+            )
+            per_message.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(handle(message) for message in messages))
+    await asyncio.sleep(0)  # command errors reach on_command_error through dispatched tasks
+    errors.update({f"command {name}": n for name, n in bot.command_errors.items()})
+    return per_listener, per_message, scheduled, errors
+
+
+def summarize(samples: list) -> dict:
+    ordered = sorted(samples)
+
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000
+
+    return {
+        "count": len(samples),
+        "mean_ms": statistics.fmean(samples) * 1000,
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+def print_report(report: dict):
+    print(f"Loaded cogs: {', '.join(report['loaded_cogs'])}")
+    for name, error in report["failed_cogs"].items():
+        print(f"  failed to load {name}: {error}")
+    print()
+    header = f"{'listener':<55} {'n':>7} {'mean':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}"
+    print(header)
+    print("-" * len(header))
+    rows = sorted(report["listeners"].items(), key=lambda kv: -kv[1]["mean_ms"])
+    rows.append(("TOTAL per message", report["per_message"]))
+    for name, s in rows:
+        print(f"{name:<55} {s['count']:>7} {s['mean_ms']:>8.3f}ms {s['p50_ms']:>7.3f}ms "
+              f"{s['p95_ms']:>7.3f}ms {s['p99_ms']:>7.3f}ms {s['max_ms']:>7.3f}ms")
+    print()
+    print(f"Throughput: {report['throughput_msgs_per_s']:.1f} messages/s "
+          f"({report['messages']} messages in {report['elapsed_s']:.2f}s, concurrency {report['concurrency']})")
+    print(f"Handlers scheduled per message: {report['handlers_per_message']:.2f}")
+    print("Supabase calls:", ", ".join(f"{k}={v}" for k, v in sorted(report["supabase_calls"].items())) or "none")
+    print("Discord calls: ", ", ".join(f"{k}={v}" for k, v in sorted(report["discord_calls"].items())) or "none")
+    if report["errors"]:
+        print("Listener errors:", ", ".join(f"{k} x{v}" for k, v in report["errors"].items()))
+
+
+async def main(args) -> int:
+    global DISCORD_LATENCY
+    DISCORD_LATENCY = args.discord_latency
+    rng = random.Random(args.seed)
+
+    client = LocalSupabase(latency=args.db_latency)
+    seed_database(client, args.users, rng)
+
+    bot, loaded, failed = await build_bot(client)
+    main_guild, other_guild = FakeGuild(MAIN_GUILD_ID), FakeGuild(1411767823730085971)
+    channels = {
+        "general": FakeChannel(GENERAL_CHANNEL_ID, main_guild),
+        "submissions": FakeChannel(SUBMISSIONS_CHANNEL_ID, main_guild),
+        "game": FakeChannel(GAME_CHANNEL_ID, main_guild),
+        "other": FakeChannel(1400000000000000002, other_guild),
+    }
+    game_tasks = start_games(bot, channels)
+    await asyncio.sleep(0.1)  # let the guess game register its listener
+
+    # Setup traffic (loading cogs, starting games) isn't part of the measurement
+    client.reset_calls()
+    DISCORD_CALLS.clear()
+
+    messages = build_stream(args.messages, args.users, rng, channels)
+    start = time.perf_counter()
+    per_listener, per_message, scheduled, errors = await run_stream(bot, messages, args.concurrency)
+    elapsed = time.perf_counter() - start
+
+    for task in game_tasks:
+        task.cancel()
+    await asyncio.gather(*game_tasks, return_exceptions=True)
+    await bot.ledger.close()  # include the buffered points flush in the call counts
+    bot.db.close()
+
+    report = {
+        "messages": len(messages),
+        "concurrency": args.concurrency,
+        "db_latency_s": args.db_latency,
+        "discord_latency_s": args.discord_latency,
+        "elapsed_s": elapsed,
+        "throughput_msgs_per_s": len(messages) / elapsed if elapsed else 0.0,
+        "loaded_cogs": loaded,
+        "failed_cogs": failed,
+        "listeners": {name: summarize(samples) for name, samples in per_listener.items()},
+        "per_message": summarize(per_message),
+        "handlers_per_message": statistics.fmean(scheduled) if scheduled else 0.0,
+        "supabase_calls": {f"{table}.{op}": n for (table, op), n in client.calls.items()},
+        "discord_calls": dict(DISCORD_CALLS),
+        "errors": dict(errors),
+    }
+    print_report(report)
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2))
+
+    # A listener that raised skipped its work, so its timings mean nothing
+    if report["errors"]:
+        print("FAIL: listeners raised errors")
+        return 1
+    if args.fail_over_ms is not None and report["per_message"]["p95_ms"] > args.fail_over_ms:
+        print(f"FAIL: per-message p95 {report['per_message']['p95_ms']:.3f}ms > {args.fail_over_ms}ms")
+        return 1
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=2000, help="messages in the synthetic stream")
+    parser.add_argument("--users", type=int, default=200, help="distinct authors / points rows")
+    parser.add_argument("--concurrency", type=int, default=1, help="messages in flight at once")
+    parser.add_argument("--db-latency", type=float, default=0.0, help="seconds per Supabase call")
+    parser.add_argument("--discord-latency", type=float, default=0.0, help="seconds per Discord API call")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--json", help="also write the report to this file")
+    parser.add_argument("--fail-over-ms", type=float, help="exit 1 if per-message p95 exceeds this")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    # Cogs import from the repo root and leveling_cog writes its SQLite file to the cwd
+    os.chdir(tempfile.mkdtemp(prefix="slop-bench-"))
+    sys.exit(asyncio.run(main(arguments)))
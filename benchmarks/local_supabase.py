@@ -0,0 +1,404 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+# --- Local Supabase stand-in ---
+# SQLite-backed drop-in for the part of the supabase client the bot uses, so data
+# paths can be benchmarked and soak-tested without network access:
+#
+#     client = LocalSupabase(latency=0.05)
+#     bot.db = SlopDB(client)
+#
+# Supported: table()/from_(), select (with count="exact"), insert, update, upsert
+# (with on_conflict), delete, the eq/neq/gt/gte/lt/lte/in_ filters, order, limit,
+# range, rpc() for registered functions, and execute().data / .count.
+# Every execute() sleeps for the injected latency and is tallied in client.calls.
+# Selecting, filtering, ordering or updating a column the table doesn't have raises
+# LocalAPIError with PostgREST's code, as the real client's APIError would.
+
+# table -> (conflict columns, {column: sqlite type}); unknown columns are added by insert/upsert
+SCHEMAS = {
+    "points": (("user_id",), {"user_id": "TEXT", "name": "TEXT", "points": "INTEGER", "house_seen": "INTEGER NOT NULL DEFAULT 0"}),
+    "imitations": (("name",), {"name": "TEXT", "imitations": "TEXT"}),
+    "keyword_reactions": (("keyword",), {"keyword": "TEXT", "emoji": "TEXT", "added_by": "TEXT"}),
+    "banned_combos": (("song1", "song2"), {"song1": "TEXT", "song2": "TEXT"}),
+    "slopgen_songs": (("pool", "title"), {"pool": "INTEGER", "title": "TEXT", "bpm": "REAL", "key": "TEXT", "tolerance_down": "REAL", "tolerance_up": "REAL"}),
+    "points_batches": (("batch_id",), {"batch_id": "TEXT", "applied_at": "REAL"}),
+    "miscinfo": (("id",), {"id": "INTEGER", "attribute": "TEXT", "count": "INTEGER"}),
+    "dls_levels": (("user_id",), {"user_id": "INTEGER", "username": "TEXT", "level": "INTEGER", "xp": "INTEGER", "total_xp": "INTEGER", "rank": "INTEGER"}),
+    "gdsongdata": (("id",), {"title": "TEXT", "author": "TEXT", "bpm": "REAL", "key_signature": "TEXT", "time_signature": "TEXT", "difficulty": "TEXT", "changes": "TEXT", "updated_at": "TEXT"}),
+    "nongdsongdata": (("id",), {"title": "TEXT", "author": "TEXT", "bpm": "REAL", "key_signature": "TEXT", "time_signature": "TEXT", "difficulty": "TEXT", "changes": "TEXT", "updated_at": "TEXT"}),
+}
+
+# Columns holding arrays / json in Supabase; stored as JSON text here
+JSON_COLUMNS = {
+    "imitations": {"imitations"},
+    "gdsongdata": {"changes"},
+    "nongdsongdata": {"changes"},
+}
+
+_OPERATORS = {"eq": "=", "neq": "!=", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+
+
+class LocalAPIError(Exception):
+    """Same shape as postgrest's APIError: message, code, hint and details from the error body."""
+
+    def __init__(self, error: dict):
+        self._raw_error = error
+        self.message = error.get("message")
+        self.code = error.get("code")
+        self.hint = error.get("hint")
+        self.details = error.get("details")
+        super().__init__(str(error))
+
+    def json(self) -> dict:
+        return self._raw_error
+
+
+class LocalResponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+    def __repr__(self):
+        return f"LocalResponse(data={self.data!r}, count={self.count!r})"
+
+
+class LocalSupabase:
+    def __init__(self, path: str = ":memory:", latency=0.0):
+        """latency is seconds per call, or a zero-argument callable returning seconds."""
+        self.latency = latency
+        self.calls = Counter()  # (table or rpc name, operation) -> number of execute() calls
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        self._columns: dict[str, set] = {}
+        self._json = {table: set(columns) for table, columns in JSON_COLUMNS.items()}
+        self._rpcs = {"increment_points_batch": _increment_points_batch}
+
+    # ---------------- Client API ----------------
+    def table(self, name: str) -> "LocalQuery":
+        return LocalQuery(self, name)
+
+    from_ = table
+
+    def rpc(self, name: str, params: dict | None = None) -> "LocalRPC":
+        return LocalRPC(self, name, params or {})
+
+    def register_rpc(self, name: str, func):
+        """Register func(client, **params) -> list of rows as a callable rpc."""
+        self._rpcs[name] = func
+
+    # ---------------- Helpers ----------------
+    def seed(self, table: str, rows: list):
+        """Bulk-load rows without latency or call accounting (for fixtures)."""
+        with self._lock:
+            self._upsert(table, rows, None)
+            self._conn.commit()
+
+    def reset_calls(self):
+        self.calls.clear()
+
+    def _delay(self):
+        delay = self.latency() if callable(self.latency) else self.latency
+        if delay:
+            time.sleep(delay)
+
+    def _ensure_table(self, table: str, columns=()):
+        if table not in self._columns:
+            conflict, declared = SCHEMAS.get(table, (("id",), {"id": "INTEGER"}))
+            if conflict == ("id",):
+                declared = {**declared, "id": "INTEGER PRIMARY KEY AUTOINCREMENT"}
+                body = ", ".join(f'"{col}" {kind}' for col, kind in declared.items())
+            else:
+                body = ", ".join(f'"{col}" {kind}' for col, kind in declared.items())
+                body += ", PRIMARY KEY (" + ", ".join(f'"{col}"' for col in conflict) + ")"
+            self._conn.execute(f'CREATE TABLE IF NOT EXISTS "{table}" ({body})')
+            self._columns[table] = set(declared)
+        for column in columns:
+            if column not in self._columns[table]:
+                self._conn.execute(f'ALTER TABLE "{table}" ADD COLUMN "{column}"')
+                self._columns[table].add(column)
+
+    def _check_columns(self, table: str, columns):
+        """Raise PostgREST's undefined column error (Postgres 42703) for any column table lacks."""
+        for column in columns:
+            if column != "*" and column not in self._columns[table]:
+                raise LocalAPIError({
+                    "message": f"column {table}.{column} does not exist",
+                    "code": "42703",
+                    "hint": None,
+                    "details": None,
+                })
+
+    def _encode(self, table: str, row: dict) -> dict:
+        encoded = {}
+        for column, value in row.items():
+            if isinstance(value, (list, dict)):
+                self._json.setdefault(table, set()).add(column)
+                value = json.dumps(value)
+            encoded[column] = value
+        return encoded
+
+    def _decode(self, table: str, row) -> dict:
+        json_columns = self._json.get(table, ())
+        out = dict(row)
+        for column in json_columns:
+            if isinstance(out.get(column), str):
+                out[column] = json.loads(out[column])
+        return out
+
+    def _select_all(self, table: str, where: str, params: list, columns="*", order="", tail="") -> list:
+        cur = self._conn.execute(f'SELECT {columns} FROM "{table}"{where}{order}{tail}', params)
+        return [self._decode(table, row) for row in cur.fetchall()]
+
+    def _insert(self, table: str, rows: list) -> list:
+        out = []
+        for row in rows:
+            row = self._encode(table, row)
+            self._ensure_table(table, row)
+            cols = ", ".join(f'"{c}"' for c in row)
+            marks = ", ".join("?" for _ in row)
+            cur = self._conn.execute(f'INSERT INTO "{table}" ({cols}) VALUES ({marks}) RETURNING *', list(row.values()))
+            out.extend(self._decode(table, r) for r in cur.fetchall())
+        return out
+
+    def _upsert(self, table: str, rows: list, on_conflict: str | None) -> list:
+        self._ensure_table(table)
+        if on_conflict:
+            conflict = tuple(c.strip() for c in on_conflict.split(","))
+        else:
+            conflict = SCHEMAS.get(table, (("id",), None))[0]
+        if conflict != SCHEMAS.get(table, (("id",), None))[0]:
+            index = f"{table}_{'_'.join(conflict)}_key"
+            self._conn.execute(
+                f'CREATE UNIQUE INDEX IF NOT EXISTS "{index}" ON "{table}" ('
+                + ", ".join(f'"{c}"' for c in conflict) + ")"
+            )
+        out = []
+        for row in rows:
+            row = self._encode(table, row)
+            self._ensure_table(table, row)
+            cols = ", ".join(f'"{c}"' for c in row)
+            marks = ", ".join("?" for _ in row)
+            updates = ", ".join(f'"{c}" = excluded."{c}"' for c in row if c not in conflict)
+            action = f"DO UPDATE SET {updates}" if updates else "DO NOTHING"
+            target = ", ".join(f'"{c}"' for c in conflict)
+            cur = self._conn.execute(
+                f'INSERT INTO "{table}" ({cols}) VALUES ({marks}) ON CONFLICT ({target}) {action} RETURNING *',
+                list(row.values()),
+            )
+            out.extend(self._decode(table, r) for r in cur.fetchall())
+        return out
+
+
+class LocalQuery:
+    def __init__(self, client: LocalSupabase, table: str):
+        self.client = client
+        self.table = table
+        self.operation = None
+        self.payload = None
+        self.columns = "*"
+        self.count_mode = None
+        self.on_conflict = None
+        self.filters = []
+        self.ordering = []
+        self.limit_count = None
+        self.offset = None
+
+    # ---------------- Operations ----------------
+    def select(self, columns: str = "*", count: str | None = None):
+        self.operation = "select"
+        self.columns = columns
+        self.count_mode = count
+        return self
+
+    def insert(self, rows, **kwargs):
+        self.operation = "insert"
+        self.payload = rows if isinstance(rows, list) else [rows]
+        return self
+
+    def upsert(self, rows, on_conflict: str | None = None, **kwargs):
+        self.operation = "upsert"
+        self.payload = rows if isinstance(rows, list) else [rows]
+        self.on_conflict = on_conflict
+        return self
+
+    def update(self, values: dict, **kwargs):
+        self.operation = "update"
+        self.payload = values
+        return self
+
+    def delete(self, **kwargs):
+        self.operation = "delete"
+        return self
+
+    # ---------------- Filters / modifiers ----------------
+    def _filter(self, op: str, column: str, value):
+        self.filters.append((op, column, value))
+        return self
+
+    def eq(self, column, value):
+        return self._filter("eq", column, value)
+
+    def neq(self, column, value):
+        return self._filter("neq", column, value)
+
+    def gt(self, column, value):
+        return self._filter("gt", column, value)
+
+    def gte(self, column, value):
+        return self._filter("gte", column, value)
+
+    def lt(self, column, value):
+        return self._filter("lt", column, value)
+
+    def lte(self, column, value):
+        return self._filter("lte", column, value)
+
+    def in_(self, column, values):
+        return self._filter("in", column, list(values))
+
+    def order(self, column: str, desc: bool = False, **kwargs):
+        self.ordering.append((column, desc))
+        return self
+
+    def limit(self, count: int, **kwargs):
+        self.limit_count = count
+        return self
+
+    def range(self, start: int, end: int, **kwargs):
+        self.offset = start
+        self.limit_count = end - start + 1
+        return self
+
+    # ---------------- Execution ----------------
+    def _where(self):
+        clauses, params = [], []
+        for op, column, value in self.filters:
+            if op == "in":
+                if not value:
+                    clauses.append("0")
+                    continue
+                clauses.append(f'"{column}" IN (' + ", ".join("?" for _ in value) + ")")
+                params.extend(value)
+            else:
+                clauses.append(f'"{column}" {_OPERATORS[op]} ?')
+                params.append(value)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def execute(self) -> LocalResponse:
+        client = self.client
+        client._delay()
+        client.calls[(self.table, self.operation)] += 1
+        with client._lock:
+            client._ensure_table(self.table)
+            client._check_columns(self.table, [column for _, column, _ in self.filters])
+            where, params = self._where()
+            if self.operation == "select":
+                selected = [c.strip() for c in self.columns.split(",")]
+                client._check_columns(self.table, selected + [column for column, _ in self.ordering])
+                columns = "*" if selected == ["*"] else ", ".join(f'"{c}"' for c in selected)
+                order = ""
+                if self.ordering:
+                    order = " ORDER BY " + ", ".join(f'"{c}" {"DESC" if d else "ASC"}' for c, d in self.ordering)
+                tail = ""
+                if self.limit_count is not None:
+                    tail = f" LIMIT {int(self.limit_count)}"
+                    if self.offset:
+                        tail += f" OFFSET {int(self.offset)}"
+                data = client._select_all(self.table, where, params, columns, order, tail)
+                count = None
+                if self.count_mode:
+                    count = client._conn.execute(f'SELECT COUNT(*) FROM "{self.table}"{where}', params).fetchone()[0]
+                return LocalResponse(data, count)
+
+            if self.operation == "insert":
+                data = client._insert(self.table, self.payload)
+            elif self.operation == "upsert":
+                data = client._upsert(self.table, self.payload, self.on_conflict)
+            elif self.operation == "update":
+                values = client._encode(self.table, self.payload)
+                missing = [column for column in values if column not in client._columns[self.table]]
+                if missing:
+                    raise LocalAPIError({
+                        "message": f"Could not find the '{missing[0]}' column of '{self.table}' in the schema cache",
+                        "code": "PGRST204",
+                        "hint": None,
+                        "details": None,
+                    })
+                sets = ", ".join(f'"{c}" = ?' for c in values)
+                cur = client._conn.execute(
+                    f'UPDATE "{self.table}" SET {sets}{where} RETURNING *', list(values.values()) + params
+                )
+                data = [client._decode(self.table, r) for r in cur.fetchall()]
+            elif self.operation == "delete":
+                cur = client._conn.execute(f'DELETE FROM "{self.table}"{where} RETURNING *', params)
+                data = [client._decode(self.table, r) for r in cur.fetchall()]
+            else:
+                raise ValueError(f"No operation set on query for {self.table!r}")
+            client._conn.commit()
+        return LocalResponse(data)
+
+
+class LocalRPC:
+    def __init__(self, client: LocalSupabase, name: str, params: dict):
+        self.client = client
+        self.name = name
+        self.params = params
+
+    def execute(self) -> LocalResponse:
+        client = self.client
+        if self.name not in client._rpcs:
+            raise ValueError(f"Unknown rpc {self.name!r}")
+        client._delay()
+        client.calls[(self.name, "rpc")] += 1
+        with client._lock:
+            data = client._rpcs[self.name](client, **self.params)
+            client._conn.commit()
+        return LocalResponse(data)
+
+
+# --- Built-in rpcs (mirrors of the functions in sql/) ---
+def _increment_points_batch(client: LocalSupabase, p_rows: list, p_house_delta: int = 0, p_batch_id=None) -> list:
+    conn = client._conn
+    client._ensure_table("points")
+    client._ensure_table("miscinfo")
+    if p_batch_id is not None:
+        client._ensure_table("points_batches")
+        cur = conn.execute(
+            "INSERT INTO points_batches (batch_id, applied_at) VALUES (?, ?) ON CONFLICT DO NOTHING",
+            (p_batch_id, time.time()),
+        )
+        if cur.rowcount == 0:
+            # Already applied: report the current balances without applying it again
+            out = []
+            for row in p_rows:
+                hit = conn.execute("SELECT user_id, points FROM points WHERE user_id = ?", (row["user_id"],)).fetchone()
+                if hit:
+                    out.append({"out_user_id": hit[0], "out_points": hit[1]})
+            return out
+        conn.execute("DELETE FROM points_batches WHERE applied_at < ?", (time.time() - 86400,))
+    if p_house_delta:
+        cur = conn.execute('UPDATE miscinfo SET "count" = "count" + ? WHERE attribute = ?', (p_house_delta, "house_offset"))
+        if cur.rowcount == 0:
+            conn.execute('INSERT INTO miscinfo (attribute, "count") VALUES (?, ?)', ("house_offset", p_house_delta))
+
+    out = []
+    for row in p_rows:
+        cur = conn.execute(
+            """
+            INSERT INTO points (user_id, name, points, house_seen) VALUES (?, ?, ?, ?)
+            ON CONFLICT (user_id) DO UPDATE SET
+                points = points + excluded.points,
+                name = CASE WHEN excluded.name = 'Unknown' THEN name ELSE excluded.name END,
+                house_seen = excluded.house_seen
+            RETURNING user_id, points
+            """,
+            (row["user_id"], row.get("name") or "Unknown", row["delta"], row.get("house_seen") or 0),
+        )
+        user_id, points = cur.fetchone()
+        out.append({"out_user_id": user_id, "out_points": points})
+    return out
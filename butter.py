@@ -1,44 +1,8 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import os
-from dotenv import load_dotenv
-from supabase import create_client
 from collections import deque
 
-load_dotenv()
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SERVICE_ROLE_KEY = os.getenv("SERVICE_ROLE_KEY")
-if not SUPABASE_URL or not SERVICE_ROLE_KEY:
-    raise ValueError("SUPABASE_URL or SERVICE_ROLE_KEY not found in environment variables.")
-
-# ---------------------- POINTS HELPERS ----------------------
-def fetch_points():
-    """Load all points from Supabase (normalize to ints)."""
-    res = supabase.table("points").select("*").execute()
-    points = {}
-    for row in (res.data or []):
-        points[str(row["user_id"])] = {
-            "name": row.get("name", "Unknown"),
-            "points": int(row.get("points", 0))
-        }
-    return points
-
-def save_points(points: dict):
-    """Upsert points to Supabase (store ints)."""
-    payload = []
-    for user_id, info in points.items():
-        payload.append({
-            "user_id": user_id,
-            "name": info.get("name", "Unknown"),
-            "points": int(info.get("points", 0))
-        })
-    if payload:
-        supabase.table("points").upsert(payload).execute()
-
-# create supabase client for this cog (uses same env as SlopGen)
-supabase = create_client(SUPABASE_URL, SERVICE_ROLE_KEY)
-
 class Butter(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -48,43 +12,36 @@ class Butter(commands.Cog):
         self._recent_deque = deque(maxlen=10000)
         self._recent_set = set()
 
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        # ignore bots and DMs
-        if message.author.bot or message.guild is None:
-            return
+    async def cog_load(self):
+        # only butter users' guild messages reach the handler (no bots, no DMs)
+        self._route = self.bot.router.add(self.on_message, authors=self._butter_users, guild_only=True)
 
-        if message.author.id in self._butter_users:
-            try:
-                await message.add_reaction("🧈")
-            except discord.Forbidden:
-                # missing permissions to add reactions — silently ignore
-                pass
-            except Exception:
-                # avoid bubbling unexpected errors from this listener
-                pass
+    async def cog_unload(self):
+        self.bot.router.remove(self._route)
+
+    async def on_message(self, message: discord.Message):
+        try:
+            await message.add_reaction("🧈")
+        except discord.Forbidden:
+            # missing permissions to add reactions — silently ignore
+            pass
+        except Exception:
+            # avoid bubbling unexpected errors from this listener
+            pass
 
     async def _increment_misc_by_id(self, row_id: int, delta: int = 1):
         """Increment the 'count' in miscinfo where id == row_id (create if missing)."""
-        # read current
-        res = supabase.from_("miscinfo").select("count").eq("id", row_id).execute()
+        # read current (errors propagate so a failed read never resets the counter)
+        rows = await self.bot.db.select("miscinfo", "count", id=row_id)
         current = 0
-        if res.data and len(res.data) > 0:
+        if rows:
             try:
-                current = int(res.data[0].get("count", 0))
+                current = int(rows[0].get("count", 0))
             except Exception:
                 current = 0
 
-        new_value = current + delta
-        # attempt update
-        upd = supabase.from_("miscinfo").update({"count": new_value}).eq("id", row_id).execute()
-        # if update didn't affect a row (row missing), insert a fallback
-        if getattr(upd, "count", 0) == 0:
-            try:
-                supabase.from_("miscinfo").insert({"id": row_id, "count": new_value}).execute()
-            except Exception:
-                # ignore insertion errors, don't crash the bot
-                pass
+        # update, inserting the row if it is missing; failures are logged, not raised
+        await self.bot.db.set_misc(current + delta, id=row_id)
 
     @commands.Cog.listener()
     async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
@@ -130,12 +87,10 @@ class Butter(commands.Cog):
     # --- /butter ---
     @app_commands.command(name="butter", description="Check how many times Margaryna has been buttered")
     async def butter(self, interaction: discord.Interaction):
-        res = supabase.from_("miscinfo").select("count").eq("id", 3).execute()
-        if res.data and len(res.data) > 0:
-            try:
-                count = int(res.data[0].get("count", 0))
-            except Exception:
-                count = 0
+        try:
+            count = int(await self.bot.db.get_misc(0, id=3))
+        except Exception:
+            count = 0
         await interaction.response.send_message(f"Margaryna has been buttered {count} times.")
 
 
@@ -0,0 +1,102 @@
+import asyncio
+import logging
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+
+class MessageRoute:
+    """One handler plus the declarative filters that decide which messages reach it."""
+
+    def __init__(self, handler, channels=None, guilds=None, authors=None,
+                 ignore_bots: bool = True, ignore_roles=None, guild_only: bool = False):
+        self.handler = handler
+        self.channels = frozenset(channels) if channels else None
+        self.guilds = frozenset(guilds) if guilds else None
+        self.authors = frozenset(authors) if authors else None
+        self.ignore_bots = ignore_bots
+        self.ignore_roles = frozenset(ignore_roles) if ignore_roles else None
+        self.guild_only = guild_only or self.guilds is not None
+
+    @property
+    def name(self) -> str:
+        return getattr(self.handler, "__qualname__", repr(self.handler)).replace(".<locals>", "")
+
+    def accepts(self, message: discord.Message) -> bool:
+        # The index already matched the most selective filter; these are the rest
+        author = message.author
+        if self.ignore_bots and author.bot:
+            return False
+        if self.guild_only and message.guild is None:
+            return False
+        if self.channels is not None and message.channel.id not in self.channels:
+            return False
+        if self.guilds is not None and message.guild.id not in self.guilds:
+            return False
+        if self.authors is not None and author.id not in self.authors:
+            return False
+        if self.ignore_roles is not None and any(role.id in self.ignore_roles for role in getattr(author, "roles", ())):
+            return False
+        return True
+
+
+# --- on_message router ---
+# Cogs register handlers with filters instead of using @commands.Cog.listener("on_message").
+# Routes are indexed by their most selective filter (channel, then author, then guild),
+# so a message only creates tasks for the handlers that can apply to it. SlopGen's
+# on_message calls dispatch() for every message.
+class MessageRouter:
+    def __init__(self):
+        self._by_channel: dict[int, list] = {}
+        self._by_author: dict[int, list] = {}
+        self._by_guild: dict[int, list] = {}
+        self._global: list = []
+
+    def add(self, handler, **filters) -> MessageRoute:
+        """Register an async handler(message); see MessageRoute for the filters. Returns the route."""
+        route = MessageRoute(handler, **filters)
+        for bucket in self._buckets(route):
+            bucket.append(route)
+        return route
+
+    def remove(self, route: MessageRoute):
+        for bucket in self._buckets(route):
+            if route in bucket:
+                bucket.remove(route)
+        # Drop empty index entries so dynamic routes (game channels) don't pile up
+        for index in (self._by_channel, self._by_author, self._by_guild):
+            for key in [key for key, routes in index.items() if not routes]:
+                del index[key]
+
+    def _buckets(self, route: MessageRoute) -> list:
+        if route.channels is not None:
+            return [self._by_channel.setdefault(cid, []) for cid in route.channels]
+        if route.authors is not None:
+            return [self._by_author.setdefault(aid, []) for aid in route.authors]
+        if route.guilds is not None:
+            return [self._by_guild.setdefault(gid, []) for gid in route.guilds]
+        return [self._global]
+
+    def routes_for(self, message: discord.Message) -> list:
+        """Every route whose filters accept the message."""
+        candidates = list(self._global)
+        candidates += self._by_channel.get(message.channel.id, ())
+        candidates += self._by_author.get(message.author.id, ())
+        if message.guild is not None:
+            candidates += self._by_guild.get(message.guild.id, ())
+        return [route for route in candidates if route.accepts(message)]
+
+    def dispatch(self, message: discord.Message) -> list:
+        """Schedule the matching handlers as tasks, the way discord.py dispatches listeners."""
+        return [
+            asyncio.create_task(self._run(route, message), name=f"router:{route.name}")
+            for route in self.routes_for(message)
+        ]
+
+    @staticmethod
+    async def _run(route: MessageRoute, message: discord.Message):
+        try:
+            await route.handler(message)
+        except Exception:
+            logger.exception("Message handler %s failed for message %s", route.name, message.id)
@@ -0,0 +1,57 @@
+import logging
+import random
+
+import discord
+from discord import app_commands
+
+logger = logging.getLogger(__name__)
+
+
+# --- Pre-hook pipeline for app commands ---
+# Every stage is an async callable taking the interaction and returning True to let
+# the command run or False to stop it (the stage is then expected to have responded).
+class SlopCommandTree(app_commands.CommandTree):
+    def __init__(self, client, **kwargs):
+        super().__init__(client, **kwargs)
+        self.pre_hooks = []
+
+    def add_pre_hook(self, hook):
+        """Append a stage to the pipeline; stages run in the order they were added."""
+        self.pre_hooks.append(hook)
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        # Autocomplete requests also pass through here; hooks only care about real invocations
+        if interaction.type is not discord.InteractionType.application_command:
+            return True
+        for hook in self.pre_hooks:
+            try:
+                if not await hook(interaction):
+                    return False
+            except Exception:
+                logger.exception("Pre-hook %r failed; continuing with command", hook)
+        return True
+
+
+# --- Slop lottery ---
+# Rolls before the command body runs. Losing rolls (999 in 1000) never touch the
+# ledger, and a win pays out and replaces the command's response.
+class LotteryStage:
+    def __init__(self, ledger, command_names, odds: int = 1000, prize: int = 5000):
+        self.ledger = ledger
+        self.command_names = set(command_names)
+        self.odds = odds
+        self.prize = prize
+
+    async def __call__(self, interaction: discord.Interaction) -> bool:
+        command = interaction.command
+        if command is None or command.qualified_name not in self.command_names:
+            return True
+        if random.randint(1, self.odds) != 1:
+            return True
+
+        await self.ledger.adjust(interaction.user.id, self.prize, "lottery", name=str(interaction.user))
+        logger.info("User %s won the slop lottery on /%s", interaction.user, command.qualified_name)
+        await interaction.response.send_message(
+            f"You just won the slop lottery, you have received {self.prize} Slop Points"
+        )
+        return False
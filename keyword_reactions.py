@@ -1,19 +1,6 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import os
-from dotenv import load_dotenv
-from supabase import create_client, Client
-
-load_dotenv()
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SERVICE_ROLE_KEY = os.getenv("SERVICE_ROLE_KEY")
-
-if not SUPABASE_URL or not SERVICE_ROLE_KEY:
-    raise ValueError("SUPABASE_URL or SERVICE_ROLE_KEY not found in environment variables.")
-
-supabase: Client = create_client(SUPABASE_URL, SERVICE_ROLE_KEY)
-
 # Role ID required to add/remove keywords
 KEYWORD_MANAGER_ROLE_ID = 899796185966075905
 
@@ -23,18 +10,25 @@ class KeywordReactions(commands.Cog):
         self.bot = bot
         self._keyword_cache = {}  # Cache for keywords: {keyword_lower: emoji}
         self._cache_loaded = False
-        self.load_keywords()
+
+    async def cog_load(self):
+        await self.load_keywords()
+        # every non-bot message can contain a keyword, so this route is global
+        self._route = self.bot.router.add(self.on_message)
+
+    async def cog_unload(self):
+        self.bot.router.remove(self._route)
 
     def has_keyword_manager_role(self, user: discord.Member) -> bool:
         """Check if user has the keyword manager role."""
         return any(role.id == KEYWORD_MANAGER_ROLE_ID for role in user.roles)
 
-    def load_keywords(self):
+    async def load_keywords(self):
         """Load all keywords from Supabase into cache."""
         try:
-            res = supabase.table("keyword_reactions").select("keyword, emoji").execute()
+            rows = await self.bot.db.select("keyword_reactions", "keyword, emoji")
             self._keyword_cache = {}
-            for row in res.data or []:
+            for row in rows:
                 # Store keywords in lowercase for case-insensitive matching
                 keyword_lower = row["keyword"].lower()
                 self._keyword_cache[keyword_lower] = row["emoji"]
@@ -73,16 +67,13 @@ class KeywordReactions(commands.Cog):
                 await interaction.response.send_message("❌ Please provide at least one valid keyword!", ephemeral=True)
                 return
 
-            # Check for existing keywords
-            existing_keywords = []
-            new_keywords = []
-            
-            for keyword_clean in keyword_list:
-                existing = supabase.table("keyword_reactions").select("*").eq("keyword", keyword_clean).execute()
-                if existing.data:
-                    existing_keywords.append(keyword_clean)
-                else:
-                    new_keywords.append(keyword_clean)
+            db = self.bot.db
+
+            # Check for existing keywords (one round trip for the whole list)
+            existing = await db.execute(db.table("keyword_reactions").select("keyword").in_("keyword", keyword_list))
+            found = {row["keyword"] for row in existing.data or []}
+            existing_keywords = [kw for kw in keyword_list if kw in found]
+            new_keywords = [kw for kw in keyword_list if kw not in found]
 
             # Insert new keywords
             if new_keywords:
@@ -94,7 +85,7 @@ class KeywordReactions(commands.Cog):
                     }
                     for kw in new_keywords
                 ]
-                supabase.table("keyword_reactions").insert(payload).execute()
+                await db.execute(db.table("keyword_reactions").insert(payload))
 
                 # Update cache
                 for kw in new_keywords:
@@ -139,21 +130,20 @@ class KeywordReactions(commands.Cog):
                 await interaction.response.send_message("❌ Please provide at least one valid keyword!", ephemeral=True)
                 return
 
+            db = self.bot.db
+
             # Check for existing keywords and delete them
-            removed_keywords = []
-            not_found_keywords = []
-
-            for keyword_clean in keyword_list:
-                existing = supabase.table("keyword_reactions").select("*").eq("keyword", keyword_clean).execute()
-                if not existing.data:
-                    not_found_keywords.append(keyword_clean)
-                else:
-                    supabase.table("keyword_reactions").delete().eq("keyword", keyword_clean).execute()
-                    removed_keywords.append(keyword_clean)
-                    
-                    # Update cache
-                    if keyword_clean in self._keyword_cache:
-                        del self._keyword_cache[keyword_clean]
+            existing = await db.execute(db.table("keyword_reactions").select("keyword").in_("keyword", keyword_list))
+            found = {row["keyword"] for row in existing.data or []}
+            removed_keywords = [kw for kw in keyword_list if kw in found]
+            not_found_keywords = [kw for kw in keyword_list if kw not in found]
+
+            if removed_keywords:
+                await db.execute(db.table("keyword_reactions").delete().in_("keyword", removed_keywords))
+
+                # Update cache
+                for keyword_clean in removed_keywords:
+                    self._keyword_cache.pop(keyword_clean, None)
 
             # Build response message
             response_parts = []
@@ -203,13 +193,8 @@ class KeywordReactions(commands.Cog):
                 ephemeral=True
             )
 
-    @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
         """React to messages containing keywords."""
-        # Ignore bot messages and system messages
-        if message.author.bot or message.author == self.bot.user:
-            return
-
         # Skip if cache not loaded
         if not self._cache_loaded or not self._keyword_cache:
             return
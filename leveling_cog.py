@@ -1,6 +1,5 @@
 import os
 import logging
-import asyncio
 import aiosqlite
 import discord
 from discord.ext import commands
@@ -18,6 +17,8 @@ class LevelingCog(commands.Cog):
         self.db_path = os.path.join(os.getcwd(), 'DiscordLevelingSystem.db')
 
     async def cog_load(self):
+        self._route = self.bot.router.add(self.on_message, guild_only=True)
+
         # Ensure DB exists (create with the expected schema if missing)
         if not os.path.exists(self.db_path):
             try:
@@ -50,11 +51,10 @@ class LevelingCog(commands.Cog):
             logging.exception('Failed to initialize DiscordLevelingSystem')
 
         # Test Supabase connection
-        supabase = getattr(self.bot, 'supabase', None)
-        if supabase:
+        db = getattr(self.bot, 'db', None)
+        if db:
             try:
-                loop = asyncio.get_event_loop()
-                loop.run_in_executor(None, self._test_supabase_connection, supabase)
+                db.submit(self._test_supabase_connection, db.client)
             except Exception:
                 logging.exception('Failed to test Supabase connection')
 
@@ -67,12 +67,11 @@ class LevelingCog(commands.Cog):
         except Exception as e:
             logging.error('❌ Supabase connection failed: %s', str(e))
 
-    @commands.Cog.listener('on_message')
-    async def on_message(self, message):
-        # Ignore bots and DMs
-        if message.author.bot or message.guild is None:
-            return
+    async def cog_unload(self):
+        self.bot.router.remove(self._route)
 
+    async def on_message(self, message):
+        # Bots and DMs are filtered out by the router
         if not self.dls:
             return
 
@@ -96,14 +95,13 @@ class LevelingCog(commands.Cog):
                      md.name, md.id_number, md.level, md.xp, md.total_xp, md.rank)
 
         # Mirror member data to Supabase (non-blocking)
-        supabase = getattr(self.bot, 'supabase', None)
-        if supabase:
+        db = getattr(self.bot, 'db', None)
+        if db:
             logging.debug('Supabase client found, syncing user %s', md.id_number)
-            # Run Supabase upsert in executor to avoid blocking
-            loop = asyncio.get_event_loop()
-            loop.run_in_executor(None, self._sync_to_supabase, supabase, md)
+            # Run Supabase upsert on the shared data layer's pool to avoid blocking
+            db.submit(self._sync_to_supabase, db.client, md)
         else:
-            logging.warning('Supabase client not found on bot object')
+            logging.warning('Supabase data layer not found on bot object')
 
     def _sync_to_supabase(self, supabase, md):
         """Sync member data to Supabase (non-async, runs in executor)."""
@@ -0,0 +1,279 @@
+import functools
+import logging
+import re
+from difflib import get_close_matches
+
+logger = logging.getLogger(__name__)
+
+# Key.parse remembers this many recent strings (hits and misses alike); song keys repeat
+# across the catalog, while free-typed misses just age out
+PARSE_CACHE_SIZE = 4096
+
+# --- Pitch classes and modes ---
+SHARP_NAMES = ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"]
+FLAT_NAMES = ["C", "Db", "D", "Eb", "E", "F", "Gb", "G", "Ab", "A", "Bb", "B"]
+
+# Sharps and naturals only (what SlopGenReal.parse_key has always accepted)
+SHARP_PITCH_CLASSES = {name: pc for pc, name in enumerate(SHARP_NAMES)}
+
+PITCH_CLASSES = {
+    **SHARP_PITCH_CLASSES,
+    **{name: pc for pc, name in enumerate(FLAT_NAMES)},
+    "B#": 0, "E#": 5, "Cb": 11, "Fb": 4,
+}
+
+MODE_INTERVALS = {
+    "Major": [0, 2, 4, 5, 7, 9, 11],
+    "Ionian": [0, 2, 4, 5, 7, 9, 11],
+    "Lydian": [0, 2, 4, 6, 7, 9, 11],
+    "Mixolydian": [0, 2, 4, 5, 7, 9, 10],
+    "Minor": [0, 2, 3, 5, 7, 8, 10],
+    "Aeolian": [0, 2, 3, 5, 7, 8, 10],
+    "Dorian": [0, 2, 3, 5, 7, 9, 10],
+    "Phrygian": [0, 1, 3, 5, 7, 8, 10],
+    "Locrian": [0, 1, 3, 5, 6, 8, 10],
+    "m": [0, 2, 3, 5, 7, 8, 10]
+}
+
+# Semitones from the parent major scale's tonic to each mode's tonic (A Minor -> C Major)
+MODE_DEGREES = {
+    "Major": 0,
+    "Dorian": 2,
+    "Phrygian": 4,
+    "Lydian": 5,
+    "Mixolydian": 7,
+    "Minor": 9,
+    "Locrian": 11,
+}
+
+# Every accepted spelling of each mode, lowercase; the first one is the shortest form
+MODE_ABBREVIATIONS = {
+    "Major": ["", "maj", "major", "ion", "ionian"],
+    "Minor": ["m", "min", "minor", "aeo", "aeolian"],
+    "Dorian": ["dor", "dorian"],
+    "Phrygian": ["phr", "phryg", "phrygian"],
+    "Lydian": ["lyd", "lydian"],
+    "Mixolydian": ["mix", "mixo", "mixolydian"],
+    "Locrian": ["loc", "locrian"],
+}
+
+MODE_ALIASES = {alias: mode for mode, aliases in MODE_ABBREVIATIONS.items() for alias in aliases}
+
+enharmony = {
+    "Db Major": "C# Major", "Eb Major": "D# Major", "Gb Major": "F# Major",
+    "Ab Major": "G# Major", "Bb Major": "A# Major",
+    "Bb Minor": "A# Minor", "Db Minor": "C# Minor", "Eb Minor": "D# Minor",
+    "Gb Minor": "F# Minor", "Ab Minor": "G# Minor",
+    "Ab Mixolydian": "G# Mixolydian", "Bb Mixolydian": "A# Mixolydian",
+    "Db Mixolydian": "C# Mixolydian", "Eb Mixolydian": "D# Mixolydian",
+    "Gb Mixolydian": "F# Mixolydian",
+    "Ab Dorian": "G# Dorian", "Bb Dorian": "A# Dorian", "Eb Dorian": "D# Dorian",
+    "Gb Dorian": "F# Dorian", "Db Dorian": "C# Dorian",
+    "Bb Phrygian": "A# Phrygian", "Eb Phrygian": "D# Phrygian",
+    "Gb Phrygian": "F# Phrygian", "Ab Phrygian": "G# Phrygian",
+    "Db Lydian": "C# Lydian", "Eb Lydian": "D# Lydian",
+    "Gb Lydian": "F# Lydian", "Ab Lydian": "G# Lydian", "Bb Lydian": "A# Lydian",
+    "Bb Locrian": "A# Locrian", "Db Locrian": "C# Locrian",
+    "Eb Locrian": "D# Locrian", "Gb Locrian": "F# Locrian", "Ab Locrian": "G# Locrian"
+}
+
+
+def normalize_key(key: str) -> str:
+    """Title-case a key name and map listed flat spellings to sharps ("bb minor" -> "A# Minor")."""
+    key_title = key.strip().title()
+    return enharmony.get(key_title, key_title)
+
+
+def wrap_semitones(diff):
+    """Fold a pitch difference into -6..6 (the shorter way round)."""
+    if diff > 6:
+        diff -= 12
+    elif diff < -6:
+        diff += 12
+    return diff
+
+
+# --- Key ---
+# One immutable, interned value per (tonic, mode, offset): Key(0, "Major") is Key(0, "Major"),
+# so keys compare and hash by identity and can be used as dict keys anywhere.
+class Key:
+    __slots__ = ("tonic", "mode", "offset", "name", "flat_name", "parent")
+
+    _interned = {}
+
+    def __new__(cls, tonic: int, mode: str = "Major", offset: float = 0):
+        mode = MODE_ALIASES.get(mode.lower(), mode)
+        if mode not in MODE_DEGREES:
+            raise ValueError(f"Unknown mode: {mode!r}")
+        tonic %= 12
+        ident = (tonic, mode, offset)
+        key = cls._interned.get(ident)
+        if key is None:
+            key = super().__new__(cls)
+            suffix = f"{offset:+g}" if offset else ""
+            set_slot = object.__setattr__
+            set_slot(key, "tonic", tonic)
+            set_slot(key, "mode", mode)
+            set_slot(key, "offset", offset)
+            set_slot(key, "name", f"{SHARP_NAMES[tonic]} {mode}{suffix}")
+            set_slot(key, "flat_name", f"{FLAT_NAMES[tonic]} {mode}{suffix}")
+            # Pitch class of the parent major scale; relative keys share it
+            set_slot(key, "parent", (tonic - MODE_DEGREES[mode]) % 12)
+            cls._interned[ident] = key
+        return key
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Key is immutable")
+
+    def __reduce__(self):
+        return Key, (self.tonic, self.mode, self.offset)
+
+    def __repr__(self):
+        return f"Key({self.name!r})"
+
+    def __str__(self):
+        return self.name
+
+    @property
+    def pitch(self) -> float:
+        """Tonic pitch class including the microtonal offset."""
+        return self.tonic + self.offset
+
+    @property
+    def pitch_classes(self) -> list:
+        return [(self.tonic + i) % 12 for i in MODE_INTERVALS[self.mode]]
+
+    def transpose(self, semitones: int) -> "Key":
+        return Key(self.tonic + semitones, self.mode, self.offset)
+
+    def relatives(self) -> list:
+        """The other six modes of the same parent scale (C Major -> A Minor, D Dorian, ...)."""
+        return [
+            Key(self.parent + degree, mode, self.offset)
+            for mode, degree in MODE_DEGREES.items()
+            if mode != self.mode
+        ]
+
+    def semitones_to(self, other: "Key"):
+        """Shortest pitch shift from this key's parent scale to other's (0 for relative keys)."""
+        return wrap_semitones(other.parent + other.offset - self.parent - self.offset)
+
+    # ---------------- parsing ----------------
+    _PATTERN = re.compile(r"^\s*([A-Ga-g])([#bB♯♭]?)\s*([A-Za-z]*)\s*(?:([+-]\d+(?:\.\d+)?))?\s*$")
+
+    @classmethod
+    def parse(cls, text):
+        """Key for "C# Minor", "dbm", "F#m", "Eb Dorian+0.5", ...; None if it isn't a key. Cached per string (LRU).
+
+        A lone lowercase "m" is minor and a lone capital "M" is major, as in chord symbols:
+
+        >>> Key.parse("Cm"), Key.parse("CM"), Key.parse("C#M"), Key.parse("cmaj")
+        (Key('C Minor'), Key('C Major'), Key('C# Major'), Key('C Major'))
+        >>> suggest_keys("CM")[0], suggest_keys("Cm")[0]
+        (Key('C Major'), Key('C Minor'))
+        """
+        if not isinstance(text, str):
+            return None
+        return cls._parse(text)
+
+    @classmethod
+    @functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
+    def _parse(cls, text: str):
+        key = KEY_ALIASES.get(squash_key(text))
+        match = cls._PATTERN.match(text) if key is None else None
+        if match:
+            letter, accidental, mode, offset = match.groups()
+            accidental = {"♯": "#", "♭": "b", "B": "b"}.get(accidental, accidental)
+            tonic = PITCH_CLASSES.get(letter.upper() + accidental)
+            mode = "Major" if mode == "M" else MODE_ALIASES.get(mode.lower())
+            if tonic is not None and mode is not None:
+                key = cls(tonic, mode, float(offset) if offset else 0)
+        if key is None:
+            logger.debug("Key.parse: %r is not a key", text)
+        return key
+
+    @classmethod
+    def all(cls, offset: float = 0) -> list:
+        """All 84 keys (12 tonics x 7 modes), mode by mode."""
+        return [cls(tonic, mode, offset) for mode in MODE_DEGREES for tonic in range(12)]
+
+
+# The 84 sharp-spelled names semitone_calculator has always recognised, for exact lookups
+TABLE_KEYS = {key.name: key for key in Key.all()}
+
+
+# --- Aliases and autocomplete ---
+_CAPITAL_M = re.compile(r"^([A-Ga-g][#bB♯♭]?)M$")
+
+
+def squash_key(text: str) -> str:
+    """Lowercase a key query and drop spaces ("F# Dor" -> "f#dor"), the form aliases are stored in.
+
+    Checked before lowercasing: a lone capital "M" means major ("CM" -> "cmaj"), not minor.
+    """
+    squashed = "".join(text.split())
+    capital_m = _CAPITAL_M.match(squashed)
+    if capital_m:
+        squashed = capital_m.group(1) + "maj"
+    return squashed.lower().replace("♯", "#").replace("♭", "b")
+
+
+# B#, E#, Cb and Fb parse but rank below the everyday spellings in suggestions
+RARE_TONICS = {"b#", "e#", "cb", "fb"}
+
+
+def _build_aliases():
+    """squashed alias -> (Key, tonic spelling) for every tonic spelling x mode abbreviation ("dbmin", "f#dor", ...)."""
+    spellings = {}
+    for name, pc in PITCH_CLASSES.items():
+        spellings.setdefault(pc, []).append(name.lower())
+    aliases = {}
+    for key in Key.all():
+        for tonic in spellings[key.tonic]:
+            for mode in MODE_ABBREVIATIONS[key.mode]:
+                aliases[tonic + mode] = (key, tonic)
+    return aliases
+
+
+def _build_prefix_index(aliases, limit):
+    """prefix -> up to limit Keys, best first: exact alias, common spelling, shortest alias, mode/tonic order."""
+    mode_order = {mode: i for i, mode in enumerate(MODE_DEGREES)}
+    best = {}  # prefix -> {key: rank}
+    for alias, (key, tonic) in aliases.items():
+        for end in range(1, len(alias) + 1):
+            prefix = alias[:end]
+            rank = (alias != prefix, tonic in RARE_TONICS, len(alias), mode_order[key.mode], key.tonic)
+            ranks = best.setdefault(prefix, {})
+            if key not in ranks or rank < ranks[key]:
+                ranks[key] = rank
+    index = {
+        prefix: sorted(ranks, key=ranks.get)[:limit]
+        for prefix, ranks in best.items()
+    }
+    index[""] = Key.all()[:limit]  # nothing typed yet: majors, then minors
+    return index
+
+
+AUTOCOMPLETE_LIMIT = 25  # Discord's maximum number of choices
+_ALIAS_SPELLINGS = _build_aliases()
+KEY_ALIASES = {alias: key for alias, (key, _) in _ALIAS_SPELLINGS.items()}
+KEY_PREFIXES = _build_prefix_index(_ALIAS_SPELLINGS, AUTOCOMPLETE_LIMIT)
+
+
+@functools.lru_cache(maxsize=512)
+def suggest_keys(query: str) -> tuple:
+    """Keys for a partly typed query, best first; a dict hit for any prefix of a known alias."""
+    squashed = squash_key(query)
+    keys = KEY_PREFIXES.get(squashed)
+    if keys is not None:
+        return tuple(keys)
+    # Typos ("c#mnor"): fuzzy match against the aliases, still cached per query
+    matches = get_close_matches(squashed, list(KEY_ALIASES), n=AUTOCOMPLETE_LIMIT * 2, cutoff=0.6)
+    return tuple(dict.fromkeys(KEY_ALIASES[alias] for alias in matches))[:AUTOCOMPLETE_LIMIT]
+
+
+def table_key(name):
+    """Key for a name exactly as spelled in the key table after normalize_key, else None."""
+    if not isinstance(name, str):
+        return None
+    return TABLE_KEYS.get(normalize_key(name))
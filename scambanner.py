@@ -7,6 +7,7 @@ from typing import Dict
 logger = logging.getLogger("sbsbot.ScamBanner")
 
 IGNORED_ROLE_ID = 1429783971654406195
+SCAM_GUILD_ID = 899784386038333551
 
 # Detect attachments that are images
 def attachment_is_image(att: discord.Attachment) -> bool:
@@ -19,22 +20,21 @@ class ScamBanner(commands.Cog):
         self._recent_flags: Dict[int, float] = {}
         self._per_user_cooldown = 60.0  # seconds
 
-    # --- listener ---
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        if message.author.bot:
-            return
+    async def cog_load(self):
+        # the router skips bots, other guilds and members with the ignored role
+        self._route = self.bot.router.add(
+            self.on_message, guilds={SCAM_GUILD_ID}, ignore_roles={IGNORED_ROLE_ID}
+        )
 
-        if message.guild is None or message.guild.id != 899784386038333551:
-            return
-        
+    async def cog_unload(self):
+        self.bot.router.remove(self._route)
+
+    # --- routed on_message ---
+    async def on_message(self, message: discord.Message):
         # Ensure this is a guild member
         if not isinstance(message.author, discord.Member):
             return
-        
-        if any(role.id == IGNORED_ROLE_ID for role in message.author.roles):
-            return
-        
+
         if len(message.attachments) >= 4 and all(
             attachment_is_image(att) for att in message.attachments
         ):
@@ -1,101 +1,30 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-from difflib import get_close_matches
-import os
-import random
-from supabase import create_client, Client
-from dotenv import load_dotenv
 import logging
+from music_keys import Key, MODE_DEGREES, TABLE_KEYS, suggest_keys
+from song_catalog import search_index, song_catalog, songdata as catalog
 
 # Initialize module logger (don't reconfigure root if already configured)
 logger = logging.getLogger(__name__)
 if not logging.getLogger().hasHandlers():
     logging.basicConfig(level=logging.INFO)
 
-# ---------------------- SUPABASE INIT ----------------------
-load_dotenv()
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SERVICE_ROLE_KEY = os.getenv("SERVICE_ROLE_KEY")
-supabase: Client = create_client(SUPABASE_URL, SERVICE_ROLE_KEY)
-
 OWNER_IDS = ["1279417773013078098", "1117143387695497278", "703364595321929730"]
 
-# ---------------------- POINTS HELPERS ----------------------
-def fetch_points():
-    """Load all points from Supabase (normalize to ints)."""
-    try:
-        res = supabase.table("points").select("*").execute()
-        logger.debug("Fetched points from Supabase: rows=%s", len(res.data or []))
-    except Exception as e:
-        logger.exception("Failed to fetch points from Supabase: %s", e)
-        return {}
-    points = {}
-    for row in (res.data or []):
-        points[str(row["user_id"])] = {
-            "name": row.get("name", "Unknown"),
-            "points": int(row.get("points", 0))
-        }
-    logger.info("Loaded points for %d users", len(points))
-    return points
-
-def save_points(points: dict):
-    """Upsert points to Supabase (store ints)."""
-    payload = []
-    for user_id, info in points.items():
-        payload.append({
-            "user_id": user_id,
-            "name": info.get("name", "Unknown"),
-            "points": int(info.get("points", 0))
-        })
-    if payload:
-        try:
-            supabase.table("points").upsert(payload).execute()
-            logger.info("Upserted %d point records to Supabase", len(payload))
-        except Exception as e:
-            logger.exception("Failed to upsert points to Supabase: %s", e)
-
 # === Data ===
-keys = [
-    ["C Major", "Db Major", "D Major", "Eb Major", "E Major", "F Major", "F# Major", "G Major","Ab Major", "A Major", "Bb Major", "B Major"],
-    ["A Minor", "Bb Minor", "B Minor", "C Minor", "C# Minor", "D Minor", "D# Minor", "E Minor", "F Minor", "F# Minor", "G Minor", "G# Minor"],
-    ["G Mixolydian","Ab Mixolydian", "A Mixolydian", "Bb Mixolydian", "B Mixolydian", "C Mixolydian", "C# Mixolydian", "D Mixolydian", "Eb Mixolydian", "E Mixolydian", "F Mixolydian", "F# Mixolydian"],
-    ["D Dorian", "Eb Dorian", "E Dorian", "F Dorian", "F# Dorian", "G Dorian", "G# Dorian","A Dorian", "Bb Dorian", "B Dorian", "C Dorian", "C# Dorian"],
-    ["E Phrygian", "F Phrygian", "F# Phrygian", "G Phrygian", "G# Phrygian","A Phrygian", "A# Phrygian", "B Phrygian", "C Phrygian", "C# Phrygian", "D Phrygian", "D# Phrygian"],
-    ["F Lydian", "Gb Lydian", "G Lydian","Ab Lydian", "A Lydian", "Bb Lydian", "B Lydian", "C Lydian", "Db Lydian", "D Lydian", "Eb Lydian", "E Lydian"],
-    ["B Locrian", "C Locrian", "C# Locrian", "D Locrian", "D# Locrian", "E Locrian", "F Locrian", "F# Locrian", "G Locrian", "G# Locrian","A Locrian", "A# Locrian"]
-]
-
-enharmony = {
-    "Db Major": "C# Major", "Eb Major": "D# Major", "Gb Major": "F# Major",
-    "Ab Major": "G# Major", "Bb Major": "A# Major",
-    "Bb Minor": "A# Minor", "Db Minor": "C# Minor", "Eb Minor": "D# Minor",
-    "Gb Minor": "F# Minor", "Ab Minor": "G# Minor",
-    "Ab Mixolydian": "G# Mixolydian", "Bb Mixolydian": "A# Mixolydian",
-    "Db Mixolydian": "C# Mixolydian", "Eb Mixolydian": "D# Mixolydian",
-    "Gb Mixolydian": "F# Mixolydian",
-    "Ab Dorian": "G# Dorian", "Bb Dorian": "A# Dorian", "Eb Dorian": "D# Dorian",
-    "Gb Dorian": "F# Dorian", "Db Dorian": "C# Dorian",
-    "Bb Phrygian": "A# Phrygian", "Eb Phrygian": "D# Phrygian",
-    "Gb Phrygian": "F# Phrygian", "Ab Phrygian": "G# Phrygian",
-    "Db Lydian": "C# Lydian", "Eb Lydian": "D# Lydian",
-    "Gb Lydian": "F# Lydian", "Ab Lydian": "G# Lydian", "Bb Lydian": "A# Lydian",
-    "Bb Locrian": "A# Locrian", "Db Locrian": "C# Locrian",
-    "Eb Locrian": "D# Locrian", "Gb Locrian": "F# Locrian", "Ab Locrian": "G# Locrian"
-}
+# Key names, enharmonics and parsing live in music_keys; these are kept for callers
+# that still want the plain tables.
+KEY_TABLE_MODES = ["Major", "Minor", "Mixolydian", "Dorian", "Phrygian", "Lydian", "Locrian"]
+normalized_keys = [[Key(MODE_DEGREES[mode] + i, mode).name for i in range(12)] for mode in KEY_TABLE_MODES]
 
-# Normalize keys
-def normalize_key(key: str) -> str:
-    key_title = key.strip().title()
-    normalized = enharmony.get(key_title, key_title)
-    logger.debug("normalize_key: input=%r normalized=%r", key, normalized)
-    return normalized
+# All key names (autocomplete now goes through music_keys.suggest_keys)
+all_keys_flat = sorted(TABLE_KEYS)
 
-# Precompute normalized keys for lookup
-normalized_keys = [[normalize_key(k) for k in mode] for mode in keys]
-
-# Flatten all keys for fuzzy autocomplete
-all_keys_flat = sorted({k for mode in normalized_keys for k in mode})
+# 84x84 semitone shifts between every pair of table keys: SEMITONE_TABLE[KEY_INDEX[a]][KEY_INDEX[b]]
+TABLE_KEY_LIST = Key.all()
+KEY_INDEX = {key: i for i, key in enumerate(TABLE_KEY_LIST)}
+SEMITONE_TABLE = [[a.semitones_to(b) for b in TABLE_KEY_LIST] for a in TABLE_KEY_LIST]
 
 # ----------------- Parent mode mapping & helpers -----------------
 # Map modes to their parent quality (major or minor)
@@ -128,49 +57,30 @@ def get_parent_quality(mode: str):
 # ----------------- Semitone Calculation -----------------
 def calculate_semitones(key_1: str, key_2: str) -> str:
     logger.info("calculate_semitones called with %r -> %r", key_1, key_2)
-    key_1_norm = normalize_key(key_1)
-    key_2_norm = normalize_key(key_2)
-
-    # Check parent-mode compatibility: same tonic must belong to same parent quality
-    tonic1, mode1 = parse_key_name(key_1_norm)
-    tonic2, mode2 = parse_key_name(key_2_norm)
-    parent1 = get_parent_quality(mode1) if mode1 else None
-    parent2 = get_parent_quality(mode2) if mode2 else None
-
-    # Parent-quality mismatches are ignored for semitone calculations.
-
-    index_1 = index_2 = None
-    for mode in normalized_keys:
-        if index_1 is None and key_1_norm in mode:
-            index_1 = mode.index(key_1_norm)
-            logger.debug("Found %r in mode at index %d", key_1_norm, index_1)
-        if index_2 is None and key_2_norm in mode:
-            index_2 = mode.index(key_2_norm)
-            logger.debug("Found %r in mode at index %d", key_2_norm, index_2)
-        if index_1 is not None and index_2 is not None:
-            break
-
-    if index_1 is None and index_2 is None:
+    # Key.parse is a cached dict lookup and handles any enharmonic spelling
+    parsed_1 = Key.parse(key_1)
+    parsed_2 = Key.parse(key_2)
+
+    if parsed_1 is None and parsed_2 is None:
         logger.error("Both keys unknown: %r, %r", key_1, key_2)
         return f"This idiot just made up 2 keys 🤣"
-    elif index_1 is None:
+    elif parsed_1 is None:
         logger.error("Unknown key: %r", key_1)
         return f"Man idk what a fuck a '{key_1}' is"
-    elif index_2 is None:
+    elif parsed_2 is None:
         logger.error("Unknown key: %r", key_2)
         return f"Man idk what a fuck a '{key_2}' is"
 
-    diff = index_2 - index_1
+    key_1_norm = parsed_1.name
+    key_2_norm = parsed_2.name
+    # Relative keys share a parent scale, so they need no pitching
+    diff = parsed_1.semitones_to(parsed_2)
     if diff == 0:
         msg = f"No pitching needed for {key_1_norm} and {key_2_norm}."
         logger.info(msg)
         return msg
 
-    if diff > 6:
-        diff -= 12
-    elif diff < -6:
-        diff += 12
-    diff_str = f"+{diff}" if diff > 0 else str(diff)
+    diff_str = f"+{diff:g}" if diff > 0 else f"{diff:g}"
 
     if abs(diff) == 6:
         msg = f"You need to pitch {key_1_norm} ±6 semitones to get to {key_2_norm}."
@@ -182,17 +92,81 @@ def calculate_semitones(key_1: str, key_2: str) -> str:
     logger.info("Calculated semitone diff: %s -> %s = %s", key_1_norm, key_2_norm, diff_str)
     return msg
 
+# ----------------- Setlist planning -----------------
+SEMITONE_PLAN_MAX = 20
+PLAN_OBJECTIVES = ("total", "worst")
+
+def shift_to(key: Key, target: Key):
+    """Semitones to pitch key so it lands in target's parent scale (table lookup for untuned keys)."""
+    i = KEY_INDEX.get(key)
+    if i is not None:
+        return SEMITONE_TABLE[i][KEY_INDEX[target]]
+    return key.semitones_to(target)
+
+def plan_transpositions(keys, objective: str = "total"):
+    """Best common parent scale for a setlist.
+
+    Tries all 12 targets (relative keys cost the same, so the target's mode doesn't
+    matter) and scores each by total pitching or by the largest single shift, with the
+    other measure and then the number of songs moved as tie-breaks.
+    Returns (target, shifts) where target is a Major key and shifts[i] is for keys[i].
+    """
+    best = None
+    for tonic in range(12):
+        target = Key(tonic, "Major")
+        shifts = [shift_to(key, target) for key in keys]
+        total = sum(abs(shift) for shift in shifts)
+        worst = max((abs(shift) for shift in shifts), default=0)
+        moved = sum(1 for shift in shifts if shift)
+        cost = (total, worst, moved) if objective == "total" else (worst, total, moved)
+        if best is None or cost < best[0]:
+            best = (cost, target, shifts)
+    return best[1], best[2]
+
+def resolve_plan_item(item: str, index):
+    """(label, Key) for a key name or a catalog song; (item, None) if it's neither.
+
+    Songs resolve through Find_Key's search index, exact or unique matches only: a typo
+    or an ambiguous title comes back unknown instead of planning around a guess.
+    """
+    key = Key.parse(item)
+    if key is not None:
+        return item, key
+    name, _ = index.resolve(item)
+    if name is None:
+        return item, None
+    return name, Key.parse(catalog[name].get("key") or "")
+
+def split_setlist(text: str):
+    # Song names can contain commas, so ";" wins when it's used at all
+    separator = ";" if ";" in text else ","
+    return [item.strip() for item in text.split(separator) if item.strip()]
+
+def format_plan(labels, keys, target: Key, shifts) -> str:
+    total = sum(abs(shift) for shift in shifts)
+    worst = max(abs(shift) for shift in shifts)
+    lines = [f"🎚️ **Target: {target.name} family** (total {total:g} semitones, worst {worst:g})"]
+    for n, (label, key, shift) in enumerate(zip(labels, keys, shifts), start=1):
+        landed = Key(round(key.pitch + shift), key.mode)
+        if shift:
+            lines.append(f"{n}. {label} ({key.name}) → {shift:+g} → {landed.name}")
+        else:
+            lines.append(f"{n}. {label} ({key.name}) → no pitching")
+    return "\n".join(lines)
+
 # ----------------- Cog -----------------
 class SemitoneCalculator(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.points = fetch_points()
+
+    async def cog_load(self):
+        song_catalog.start(self.bot.db)
 
     async def key_autocomplete(self, interaction: discord.Interaction, current: str):
-        # Fuzzy autocomplete for keys (flats preferred).
-        matches = get_close_matches(current.title(), all_keys_flat, n=25, cutoff=0.1)
+        # Prefix lookup over every key alias ("c#m", "Dbmin", "F# dor"); cached per query
+        matches = suggest_keys(current)
         logger.debug("Autocomplete: user=%s current=%r matches=%d", interaction.user.id, current, len(matches))
-        return [app_commands.Choice(name=m, value=m) for m in matches]
+        return [app_commands.Choice(name=key.name, value=key.name) for key in matches]
 
     @app_commands.command(
         name="semitone_calculator",
@@ -205,21 +179,52 @@ class SemitoneCalculator(commands.Cog):
     @app_commands.autocomplete(key_from=key_autocomplete, key_to=key_autocomplete)
     async def semitone_calculator(self, interaction: discord.Interaction, key_from: str, key_to: str):
         logger.info("Command invoked: semitone_calculator by user=%s (%s -> %s)", interaction.user.id, key_from, key_to)
-        self.points = fetch_points()
         user_id = str(interaction.user.id)
 
-        if random.randint(1, 1000) == 1:
-            # ensure user exists in points dict
-            self.points.setdefault(user_id, {"name": str(interaction.user), "points": 0})
-            self.points[user_id]["points"] += 5000
-            logger.info("User %s won jackpot: +5000 (total=%d)", user_id, self.points[user_id]["points"])
-            await interaction.response.send_message("You just won the slop lottery, you have received 5000 Slop Points")
-            save_points(self.points)
-            return
-
         result = calculate_semitones(key_from, key_to)
         logger.info("Responding to user=%s result=%r", user_id, result)
         await interaction.response.send_message(result)
 
+    @app_commands.command(
+        name="semitone_plan",
+        description="Pitch a whole setlist into one key family with the least shifting."
+    )
+    @app_commands.describe(
+        setlist="Keys or catalog songs separated by commas (use ; if a song name has commas)",
+        objective="Minimise total pitching, or the biggest single shift"
+    )
+    @app_commands.choices(objective=[
+        app_commands.Choice(name="total", value="total"),
+        app_commands.Choice(name="worst", value="worst"),
+    ])
+    async def semitone_plan(self, interaction: discord.Interaction, setlist: str, objective: str = "total"):
+        logger.info("Command invoked: semitone_plan by user=%s (%r, %s)", interaction.user.id, setlist, objective)
+        items = split_setlist(setlist)
+        if len(items) < 2:
+            await interaction.response.send_message("Give me at least 2 keys or songs to plan.", ephemeral=True)
+            return
+        if len(items) > SEMITONE_PLAN_MAX:
+            await interaction.response.send_message(f"That's more than {SEMITONE_PLAN_MAX} songs, split the set up.", ephemeral=True)
+            return
+
+        await interaction.response.defer()
+        index = search_index()
+        resolved = [resolve_plan_item(item, index) for item in items]
+        unknown = [label for label, key in resolved if key is None]
+        if unknown:
+            await interaction.followup.send(
+                "Man idk what key " + ", ".join(f"'{label}'" for label in unknown) + " is in"
+                + " (use a key, or a song's exact or unique name)"
+            )
+            return
+
+        labels = [label for label, _ in resolved]
+        keys = [key for _, key in resolved]
+        target, shifts = plan_transpositions(keys, objective)
+        msg = format_plan(labels, keys, target, shifts)
+        if len(msg) > 1900:
+            msg = msg[:1900] + "\n...(truncated)..."
+        await interaction.followup.send(msg)
+
 async def setup(bot: commands.Bot):
     await bot.add_cog(SemitoneCalculator(bot))
@@ -0,0 +1,180 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 10  # seconds before a Supabase call is abandoned
+DB_WORKERS = 8  # threads available for blocking Supabase calls
+PAGE_SIZE = 1000  # rows per range request (PostgREST's default max-rows)
+PAGES_IN_FLIGHT = 4  # range requests per table running at once
+
+MISC_TABLE = "miscinfo"
+
+
+def _log_failure(future):
+    if not future.cancelled() and future.exception() is not None:
+        logger.error("Background Supabase call failed", exc_info=future.exception())
+
+
+# --- Shared Supabase data layer ---
+# One client for the whole bot, exposed to cogs as bot.db. The supabase client is
+# synchronous, so every .execute() runs on a small dedicated thread pool and is
+# bounded by a timeout; the client's HTTP session (and its connection pool) is
+# shared by all of those threads.
+#
+# Queries are built as usual and handed over unexecuted:
+#     res = await bot.db.execute(bot.db.table("imitations").select("*").eq("name", name))
+class SlopDB:
+    def __init__(self, client, timeout: float = DEFAULT_TIMEOUT, max_workers: int = DB_WORKERS):
+        self.client = client
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="supabase")
+
+    def table(self, name: str):
+        """Start a query builder for a table (no I/O happens until execute())."""
+        return self.client.table(name)
+
+    from_ = table
+
+    async def run(self, func, *args, timeout: float | None = None):
+        """Run a blocking callable on the Supabase thread pool, with a timeout."""
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, func, *args)
+        return await asyncio.wait_for(future, timeout=timeout or self.timeout)
+
+    def submit(self, func, *args):
+        """Fire-and-forget a blocking callable on the Supabase thread pool; failures are logged."""
+        future = self._executor.submit(func, *args)
+        future.add_done_callback(_log_failure)
+        return future
+
+    async def execute(self, query, timeout: float | None = None):
+        """Execute a built query off the event loop and return the response."""
+        return await self.run(query.execute, timeout=timeout)
+
+    async def select(self, table: str, columns: str = "*", **filters) -> list:
+        """Return the rows of table matching every column=value filter."""
+        query = self.table(table).select(columns)
+        for column, value in filters.items():
+            query = query.eq(column, value)
+        res = await self.execute(query)
+        return res.data or []
+
+    async def select_pages(self, table: str, columns: str = "*", *, key, order=(), where=None,
+                           page_size: int = PAGE_SIZE, in_flight: int = PAGES_IN_FLIGHT, **filters):
+        """Yield every matching row of table as lists, one per page, in the order pages arrive.
+
+        A single select is capped at the server's row limit; this asks for the row count
+        with the first page and then fetches the remaining ranges in_flight at a time.
+        Rows are sorted by order (a column or tuple of columns) and then by key, which
+        must be unique (the primary key): with ties, Postgres may order tied rows
+        differently from one range request to the next and rows get skipped or repeated.
+        where is an optional callable adding filters beyond column=value ones.
+        """
+        orders = (order,) if isinstance(order, str) else tuple(order)
+        keys = (key,) if isinstance(key, str) else tuple(key)
+        orders += tuple(column for column in keys if column not in orders)
+
+        def build(count=None):
+            query = self.table(table).select(columns, count=count)
+            for column, value in filters.items():
+                query = query.eq(column, value)
+            if where is not None:
+                query = where(query)
+            for column in orders:
+                query = query.order(column)
+            return query
+
+        async def fetch(start, end):
+            rows = []
+            while start + len(rows) <= end:
+                res = await self.execute(build().range(start + len(rows), end))
+                if not res.data:
+                    break
+                # A server row limit below page_size just means more requests for this range
+                rows.extend(res.data)
+            return rows
+
+        first = await self.execute(build("exact").range(0, page_size - 1))
+        rows = first.data or []
+        total = first.count if first.count is not None else len(rows)
+        if len(rows) < min(page_size, total):
+            rows.extend(await fetch(len(rows), page_size - 1))
+        yield rows
+
+        starts = iter(range(page_size, total, page_size))
+        semaphore = asyncio.Semaphore(in_flight)
+
+        async def fetch_page(start):
+            async with semaphore:
+                return await fetch(start, min(start + page_size, total) - 1)
+
+        pending = {asyncio.ensure_future(fetch_page(start)) for start in starts}
+        try:
+            for page in asyncio.as_completed(pending):
+                yield await page
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def rpc(self, name: str, params: dict, timeout: float | None = None):
+        return await self.execute(self.client.rpc(name, params), timeout=timeout)
+
+    # ---------------- miscinfo counters ----------------
+    async def get_misc(self, default: int = 0, **match) -> int:
+        """Fetch the count of a miscinfo row (matched by attribute=... or id=...)."""
+        try:
+            rows = await self.select(MISC_TABLE, "count", **match)
+        except Exception:
+            logger.exception("Failed to fetch misc value %s", match)
+            return default
+        if rows:
+            return rows[0]["count"]
+        return default
+
+    async def set_misc(self, value: int, **match):
+        """Set the count of a miscinfo row, inserting it if it doesn't exist yet."""
+        def _sync_set():
+            query = self.client.from_(MISC_TABLE).update({"count": value})
+            for column, match_value in match.items():
+                query = query.eq(column, match_value)
+            res = query.execute()
+            if not getattr(res, "data", None):
+                self.client.from_(MISC_TABLE).insert({**match, "count": value}).execute()
+
+        try:
+            await self.run(_sync_set)
+        except Exception:
+            logger.exception("Failed to set misc value %s to %s", match, value)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+
+async def merge_pages(streams: dict):
+    """Interleave several select_pages streams: yields (label, rows) as soon as any page lands."""
+    queue = asyncio.Queue()
+
+    async def pump(label, stream):
+        try:
+            async for rows in stream:
+                await queue.put((label, rows, None))
+            await queue.put((label, None, None))
+        except Exception as exc:
+            await queue.put((label, None, exc))
+
+    tasks = [asyncio.create_task(pump(label, stream)) for label, stream in streams.items()]
+    try:
+        remaining = len(tasks)
+        while remaining:
+            label, rows, error = await queue.get()
+            if error is not None:
+                raise error
+            if rows is None:
+                remaining -= 1
+                continue
+            yield label, rows
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,341 @@
+import asyncio
+import logging
+import uuid
+from sortedcontainers import SortedList
+
+logger = logging.getLogger(__name__)
+
+POINTS_TABLE = "points"
+MISC_TABLE = "miscinfo"
+HOUSE_OFFSET_ATTRIBUTE = "house_offset"
+INCREMENT_BATCH_RPC = "increment_points_batch"
+
+FLUSH_INTERVAL = 5  # seconds between flushes to Supabase
+FLUSH_THRESHOLD = 50  # flush early once this many users have pending deltas
+LEADERBOARD_PAGE_SIZE = 10
+
+# The house: owner bets are paid for by everyone else, non-owner bets by these accounts
+OWNER_IDS = ["1279417773013078098", "1117143387695497278", "703364595321929730"]
+
+
+# --- Shared Slop Points ledger ---
+# Loaded once at startup and exposed to cogs via bot.ledger. Balances live in memory,
+# reads never touch Supabase, and writes are buffered the same way SlopGen buffers
+# "slop ping": deltas are merged per user and flushed as one batched atomic increment.
+#
+# Owner bets are pooled: instead of touching every member row, the per-member share
+# is added to a global house offset. Each member row remembers the offset it has
+# already paid up to (house_seen), so a member's real balance is
+#     points - (house_offset - house_seen)
+# and the outstanding amount is folded into the row the next time it is written.
+class PointsLedger:
+    def __init__(self, db, flush_interval: float = FLUSH_INTERVAL, flush_threshold: int = FLUSH_THRESHOLD,
+                 owner_ids=OWNER_IDS):
+        self.db = db
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self.owner_ids = {str(uid) for uid in owner_ids}
+        # user_id -> {"name", "points" (stored balance), "seen" (house offset already applied)}
+        self._points: dict[str, dict] = {}
+        self._lock = asyncio.Lock()
+        self.loaded = False
+
+        self.house_offset = 0
+        self._member_count = 0  # users that share owner bets (everyone but the owners)
+
+        # Leaderboard index kept in step with every balance change. Keys are
+        # (-(balance + house_offset), user_id): for members that sum doesn't move when
+        # the house offset does, so only the few owner keys need re-sorting on owner bets.
+        self._ranking = SortedList()
+        self.version = 0
+        self._page_cache: dict[tuple, tuple] = {}
+
+        # Write-behind buffer: user_id -> summed delta not yet sent to Supabase
+        self._pending: dict[str, int] = {}
+        self._pending_names: dict[str, str] = {}
+        self._pending_seen: dict[str, int] = {}
+        self._pending_house = 0
+        # A batch whose RPC failed: (batch_id, rows, house). The server may or may not have
+        # applied it, so it is resent as-is under the same id and the RPC skips it if it did.
+        self._unsent: tuple | None = None
+        self._flush_lock = asyncio.Lock()
+        self._flush_event = asyncio.Event()
+        self._flush_task: asyncio.Task | None = None
+
+    # ---------------- Loading ----------------
+    async def load(self):
+        """Load every balance and the house offset from Supabase into memory."""
+        try:
+            rows = await self.db.select(POINTS_TABLE, "user_id, name, points, house_seen")
+            house = await self.db.select(MISC_TABLE, "count", attribute=HOUSE_OFFSET_ATTRIBUTE)
+            house_offset = int(house[0]["count"] or 0) if house else 0
+        except Exception:
+            logger.exception("Failed to load points from Supabase")
+            return
+
+        points = {}
+        for row in rows:
+            points[str(row["user_id"])] = {
+                "name": row.get("name") or "Unknown",
+                "points": int(row.get("points") or 0),
+                "seen": int(row.get("house_seen") or 0),
+            }
+        async with self._lock:
+            # Deltas still waiting in the buffer (or in a batch to resend) aren't in Supabase yet
+            house_offset += self._pending_house
+            buffered = [(user_id, delta, self._pending_names.get(user_id), self._pending_seen.get(user_id))
+                        for user_id, delta in self._pending.items()]
+            if self._unsent is not None:
+                house_offset += self._unsent[2]
+                buffered += [(row["user_id"], row["delta"], row["name"], row["house_seen"]) for row in self._unsent[1]]
+            for user_id, delta, name, seen in buffered:
+                entry = points.setdefault(user_id, {"name": name or "Unknown", "points": 0, "seen": house_offset})
+                entry["points"] += delta
+                if seen is not None:
+                    entry["seen"] = seen
+            self._points = points
+            self.house_offset = house_offset
+            self._member_count = sum(1 for user_id in points if user_id not in self.owner_ids)
+            self._ranking = SortedList(self._rank_key(user_id) for user_id in points)
+            self.version += 1
+            self.loaded = True
+        logger.info("Loaded points for %d users (house offset %s)", len(points), house_offset)
+
+    # ---------------- Reads ----------------
+    def _balance(self, user_id: str, entry: dict) -> int:
+        if user_id in self.owner_ids:
+            return entry["points"]
+        return entry["points"] - (self.house_offset - entry["seen"])
+
+    def _public(self, user_id: str, entry: dict) -> dict:
+        return {"name": entry["name"], "points": self._balance(user_id, entry)}
+
+    def get(self, user_id) -> dict | None:
+        """Return the user's {"name", "points"} entry, or None if unknown."""
+        user_id = str(user_id)
+        entry = self._points.get(user_id)
+        return self._public(user_id, entry) if entry else None
+
+    def balance(self, user_id) -> int:
+        user_id = str(user_id)
+        entry = self._points.get(user_id)
+        return self._balance(user_id, entry) if entry else 0
+
+    def items(self):
+        """Snapshot of (user_id, entry) pairs."""
+        return [(uid, self._public(uid, entry)) for uid, entry in self._points.items()]
+
+    def __len__(self):
+        return len(self._points)
+
+    def __contains__(self, user_id):
+        return str(user_id) in self._points
+
+    def rank(self, user_id) -> int | None:
+        """1-based leaderboard position of a user, or None if they have no entry."""
+        user_id = str(user_id)
+        if user_id not in self._points:
+            return None
+        return self._ranking.index(self._rank_key(user_id)) + 1
+
+    def page_count(self, per_page: int = LEADERBOARD_PAGE_SIZE) -> int:
+        return max(1, -(-len(self._ranking) // per_page))
+
+    def leaderboard_page(self, page: int = 1, per_page: int = LEADERBOARD_PAGE_SIZE) -> list:
+        """Return [(rank, user_id, entry), ...] for one page, cached until balances change."""
+        key = (page, per_page)
+        cached = self._page_cache.get(key)
+        if cached is not None and cached[0] == self.version:
+            return cached[1]
+
+        start = (page - 1) * per_page
+        rows = [
+            (start + offset + 1, user_id, self._public(user_id, self._points[user_id]))
+            for offset, (_, user_id) in enumerate(self._ranking.islice(start, start + per_page))
+        ]
+        self._page_cache[key] = (self.version, rows)
+        return rows
+
+    # ---------------- Writes ----------------
+    async def adjust(self, user_id, delta: int, reason: str, name: str | None = None) -> int:
+        """Change one user's balance by delta and queue it for the next flush. Returns the new balance."""
+        user_id = str(user_id)
+        delta = int(delta)
+        async with self._lock:
+            total = self._apply(user_id, delta, name)
+            pending_users = len(self._pending)
+        logger.debug("Queued %+d points for %s (%s); local total %s", delta, user_id, reason, total)
+        if pending_users >= self.flush_threshold:
+            self._flush_event.set()
+        return total
+
+    async def adjust_many(self, deltas: dict, reason: str, names: dict | None = None):
+        """Queue several deltas at once; they go out in the same batch."""
+        names = names or {}
+        async with self._lock:
+            for user_id, delta in deltas.items():
+                if delta:
+                    self._apply(str(user_id), int(delta), names.get(user_id))
+            pending_users = len(self._pending)
+        logger.debug("Queued %d point deltas (%s)", len(deltas), reason)
+        if pending_users >= self.flush_threshold:
+            self._flush_event.set()
+
+    async def owner_bet(self, owner_id, change: int, reason: str, name: str | None = None) -> int:
+        """Apply an owner's bet and charge change // members to every member through the house offset.
+
+        Costs the same as any other bet however many users exist. Returns the owner's new balance.
+        """
+        owner_id = str(owner_id)
+        change = int(change)
+        async with self._lock:
+            total = self._apply(owner_id, change, name)
+            if self._member_count:
+                share = change // self._member_count
+                if share:
+                    self._move_house(share)
+            pending_users = len(self._pending)
+        logger.debug("Owner bet %+d for %s (%s); house offset now %s", change, owner_id, reason, self.house_offset)
+        if pending_users >= self.flush_threshold:
+            self._flush_event.set()
+        return total
+
+    async def member_bet(self, user_id, change: int, reason: str, name: str | None = None) -> int:
+        """Apply a member's bet and charge change // owners to each owner that already has a row.
+
+        The house only ever moves existing owner rows; it never creates new ones. Returns the
+        member's new balance.
+        """
+        user_id = str(user_id)
+        change = int(change)
+        share = change // len(self.owner_ids) if self.owner_ids else 0
+        async with self._lock:
+            total = self._apply(user_id, change, name)
+            if share:
+                for owner_id in self.owner_ids:
+                    if owner_id in self._points:
+                        self._apply(owner_id, -share, None)
+            pending_users = len(self._pending)
+        logger.debug("Member bet %+d for %s (%s); owners charged %+d each", change, user_id, reason, -share)
+        if pending_users >= self.flush_threshold:
+            self._flush_event.set()
+        return total
+
+    def _rank_key(self, user_id: str) -> tuple:
+        return (-(self._balance(user_id, self._points[user_id]) + self.house_offset), user_id)
+
+    def _apply(self, user_id: str, delta: int, name: str | None) -> int:
+        entry = self._points.get(user_id)
+        if entry is None:
+            # New users start level with the house and owe nothing for earlier owner bets
+            entry = self._points[user_id] = {"name": name or "Unknown", "points": 0, "seen": self.house_offset}
+            self._ranking.add(self._rank_key(user_id))
+            if user_id not in self.owner_ids:
+                self._member_count += 1
+        elif name and name != entry["name"]:
+            entry["name"] = name
+        else:
+            name = None  # unchanged: don't rewrite the stored name
+
+        # Fold whatever the user still owes the house into this write
+        owed = 0 if user_id in self.owner_ids else self.house_offset - entry["seen"]
+        self._update(user_id, entry["points"] + delta - owed, self.house_offset)
+        self._queue(user_id, delta - owed, name)
+        return self._balance(user_id, entry)
+
+    def _update(self, user_id: str, points: int, seen: int):
+        entry = self._points[user_id]
+        self._ranking.remove(self._rank_key(user_id))
+        entry["points"] = points
+        entry["seen"] = seen
+        self._ranking.add(self._rank_key(user_id))
+        self.version += 1
+
+    def _move_house(self, share: int):
+        # Member keys are invariant under the offset; owner keys are not
+        owners = [user_id for user_id in self.owner_ids if user_id in self._points]
+        for user_id in owners:
+            self._ranking.remove(self._rank_key(user_id))
+        self.house_offset += share
+        self._pending_house += share
+        for user_id in owners:
+            self._ranking.add(self._rank_key(user_id))
+        self.version += 1
+
+    def _queue(self, user_id: str, delta: int, name: str | None):
+        self._pending[user_id] = self._pending.get(user_id, 0) + delta
+        if name:
+            self._pending_names[user_id] = name
+        self._pending_seen[user_id] = self._points[user_id]["seen"]
+
+    # ---------------- Flushing ----------------
+    def start(self):
+        """Start the background flush task (if not already running)."""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def close(self):
+        """Stop the flush task and push whatever is still buffered."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_event.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_event.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Send all buffered deltas as one batched increment.
+
+        Every batch carries an id and the RPC applies each id at most once. If a call fails,
+        a timeout included, the batch may or may not have been committed, so it is kept
+        and resent unchanged (same id) before anything newer; it is never merged back into
+        the buffer, which would apply it twice.
+        """
+        async with self._flush_lock:
+            resend = self._unsent is not None
+            if not resend:
+                # Atomically take pending deltas
+                async with self._lock:
+                    pending, names, seen, house = self._pending, self._pending_names, self._pending_seen, self._pending_house
+                    self._pending, self._pending_names, self._pending_seen, self._pending_house = {}, {}, {}, 0
+                rows = [
+                    {"user_id": user_id, "delta": delta, "name": names.get(user_id), "house_seen": seen.get(user_id)}
+                    for user_id, delta in pending.items()
+                ]
+                if not rows and not house:
+                    return
+                self._unsent = (uuid.uuid4().hex, rows, house)
+
+            batch_id, rows, house = self._unsent
+            try:
+                res = await self.db.rpc(
+                    INCREMENT_BATCH_RPC, {"p_rows": rows, "p_house_delta": house, "p_batch_id": batch_id}
+                )
+            except Exception:
+                logger.exception("Failed to flush %d point deltas to Supabase; will resend batch %s", len(rows), batch_id)
+                return
+            self._unsent = None
+
+            # Server totals also reflect writes made elsewhere, so they win over our copy;
+            # anything queued while the flush was in flight is layered back on top.
+            async with self._lock:
+                for row in res.data or []:
+                    user_id = str(row["out_user_id"])
+                    entry = self._points.get(user_id)
+                    if entry is not None:
+                        self._update(user_id, int(row["out_points"]) + self._pending.get(user_id, 0), entry["seen"])
+            logger.info("Flushed point deltas for %d users to Supabase (house %+d)", len(rows), house)
+        if resend and (self._pending or self._pending_house):
+            # The resent batch went through; what was queued behind it goes out now
+            await self.flush()
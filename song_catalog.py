@@ -0,0 +1,398 @@
+# song_catalog.py
+# The song catalog shared by Find_Key, SlopGenReal, semitone_calculator and ping_shlant.
+# A plain module rather than part of the Find_Key extension, so reloading that
+# extension keeps the same catalog, refresh task and search index.
+import asyncio
+import logging
+import re
+from datetime import datetime
+from slop_db import merge_pages
+from song_timeline import Timeline
+
+logger = logging.getLogger(__name__)
+
+
+def norm_text(s: str) -> str:
+    """Normalize for matching."""
+    s = s.lower()
+    s = re.sub(r"[^a-z0-9\s]+", " ", s)
+    s = re.sub(r"\s+", " ", s).strip()
+    return s
+
+
+# --- Table names ---
+GDSONG_TABLE = "gdsongdata"
+NONGDSONG_TABLE = "nongdsongdata"
+SONG_TABLES = (GDSONG_TABLE, NONGDSONG_TABLE)
+# Only what song_entry reads, plus the refresh cursor
+SONG_COLUMNS = "id, title, author, bpm, key_signature, time_signature, changes"
+CURSOR_COLUMN = "updated_at"
+SONG_KEY = "id"  # unique per row, so paging is stable (see sql/song_tables_id.sql)
+
+CATALOG_REFRESH_INTERVAL = 300  # seconds between incremental refreshes
+CATALOG_FULL_RELOAD_EVERY = 12  # every Nth refresh reloads everything, to drop deleted rows
+CATALOG_RETRY_INTERVAL = 10  # seconds before retrying a failed first load
+
+# --- Loaders ---
+def song_entry(row):
+    """(full_name, info) for a song row, formatted as '(Author) - (Title)'; None if it has no title."""
+    title = row.get("title")
+    author = row.get("author") or "Unknown Artist"
+    if not title:
+        return None
+
+    # Use parentheses around author and title as requested
+    full_name = f"({author}) - ({title})"
+    info = {
+        "title": title,
+        "author": author,
+        "bpm": row.get("bpm"),
+        "key": row.get("key_signature"),
+        "time_signature": row.get("time_signature"),
+        "changes": row.get("changes") or [],
+    }
+    info["timeline"] = Timeline.from_song(info)
+    return full_name, info
+
+
+def stream_song_rows(db, columns=SONG_COLUMNS, order=(), wheres=None):
+    """(table, rows) pages from both song tables, fetched concurrently and paged past the row limit."""
+    wheres = wheres or {}
+    return merge_pages({
+        table: db.select_pages(table, columns, key=SONG_KEY, order=order, where=wheres.get(table))
+        for table in SONG_TABLES
+    })
+
+
+def _missing_column(error, column) -> bool:
+    """True if a PostgREST error says column doesn't exist (Postgres 42703), not a timeout or outage."""
+    if getattr(error, "code", None) == "42703":
+        return True
+    message = str(getattr(error, "message", None) or error)
+    return column in message and "does not exist" in message
+
+
+def _parse_updated_at(value):
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+# --- Song catalog ---
+# Starts empty and loads in the background, so importing this module (or loading the
+# cog) never waits on Supabase. After the first full load it only asks each table for
+# rows with updated_at >= the newest one it has seen (see sql/song_catalog_updated_at.sql);
+# deletions are picked up by the periodic full reload.
+#
+# Every cog that reads it calls start() in cog_load (it only starts once), so load order
+# doesn't matter and reloading any of those extensions keeps the running task.
+#
+# songs is the dict other modules import as songdata and is only ever updated in place.
+# version goes up whenever its contents change, so anything derived from it (search
+# indexes, partner tables) can compare versions instead of re-scanning.
+class SongCatalog:
+    def __init__(self, songs=None):
+        self.songs = songs if songs is not None else {}
+        self.version = 0
+        self.loaded = asyncio.Event()
+        self._names = {}  # (table, id) -> full_name, so renamed songs replace their old entry
+        self._cursors = {}  # table -> (datetime, raw updated_at) of the newest row seen
+        self._refreshes = 0
+        self._task = None
+        self.incremental = True  # cleared if the tables turn out to have no updated_at column
+
+    def __len__(self):
+        return len(self.songs)
+
+    def start(self, db):
+        """Load in the background and keep refreshing; safe to call more than once."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(db))
+        return self._task
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self, db):
+        while True:
+            try:
+                version = self.version
+                await self.refresh(db)
+                if self.version != version:
+                    await rebuild_search_index()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Song catalog refresh failed")
+            await asyncio.sleep(CATALOG_REFRESH_INTERVAL if self.loaded.is_set() else CATALOG_RETRY_INTERVAL)
+
+    async def refresh(self, db) -> int:
+        """Fetch what changed since the last refresh (everything the first time). Returns the change count."""
+        full = not self.loaded.is_set() or not self.incremental or self._refreshes % CATALOG_FULL_RELOAD_EVERY == 0
+        self._refreshes += 1
+        if not full:
+            try:
+                return await self._refresh_since(db)
+            except Exception as e:
+                if not _missing_column(e, CURSOR_COLUMN):
+                    raise  # transient: _run logs it and the next cycle tries again
+                self._disable_incremental()
+        return await self.reload(db)
+
+    async def reload(self, db) -> int:
+        """Replace the catalog with both tables' full contents."""
+        names, songs, cursors = {}, {}, {}
+        try:
+            pages = [page async for page in stream_song_rows(db, self._columns())]
+        except Exception as e:
+            # Only a missing updated_at column turns incremental refreshes off; anything
+            # else (timeouts, outages) is retried next cycle with the cursor intact
+            if not self.incremental or not _missing_column(e, CURSOR_COLUMN):
+                raise
+            self._disable_incremental()
+            pages = [page async for page in stream_song_rows(db, self._columns())]
+        for table, rows in pages:
+            for row in rows:
+                entry = song_entry(row)
+                if entry is None:
+                    continue
+                names[(table, row[SONG_KEY])] = entry[0]
+                songs[entry[0]] = entry[1]
+                self._advance(cursors, table, row)
+
+        changed = len(songs.keys() ^ self.songs.keys()) + sum(
+            1 for name, info in songs.items() if name in self.songs and not _same_song(info, self.songs[name])
+        )
+        if changed or not self.loaded.is_set():
+            self.songs.clear()
+            self.songs.update(songs)
+            self.version += 1
+        self._names, self._cursors = names, cursors
+        if not self.loaded.is_set():
+            print(f"✅ Loaded {len(songs)} songs from Supabase.")
+            self.loaded.set()
+        logger.info("Song catalog reloaded: %d songs, %d changed (version %d)", len(songs), changed, self.version)
+        return changed
+
+    async def _refresh_since(self, db) -> int:
+        changed = 0
+        # >= rather than >: rows committed later with the same timestamp aren't skipped
+        wheres = {
+            table: (lambda query, since=cursor[1]: query.gte(CURSOR_COLUMN, since))
+            for table, cursor in self._cursors.items()
+        }
+        async for table, rows in stream_song_rows(db, self._columns(), CURSOR_COLUMN, wheres):
+            for row in rows:
+                changed += self._apply(table, row)
+                self._advance(self._cursors, table, row)
+        if changed:
+            self.version += 1
+            logger.info("Song catalog refreshed: %d songs changed (version %d)", changed, self.version)
+        return changed
+
+    def _apply(self, table, row) -> int:
+        entry = song_entry(row)
+        if entry is None:
+            return 0
+        full_name, info = entry
+        old_name = self._names.get((table, row[SONG_KEY]))
+        if old_name == full_name and full_name in self.songs and _same_song(info, self.songs[full_name]):
+            return 0
+        if old_name is not None and old_name != full_name:
+            self.songs.pop(old_name, None)
+        self._names[(table, row[SONG_KEY])] = full_name
+        self.songs[full_name] = info
+        return 1
+
+    def _disable_incremental(self):
+        logger.warning("%s has no %s column; run sql/song_catalog_updated_at.sql. Reloading in full each time",
+                       "/".join(SONG_TABLES), CURSOR_COLUMN)
+        self.incremental = False
+
+    def _columns(self):
+        return f"{SONG_COLUMNS}, {CURSOR_COLUMN}" if self.incremental else SONG_COLUMNS
+
+    @staticmethod
+    def _advance(cursors, table, row):
+        stamp = _parse_updated_at(row.get(CURSOR_COLUMN))
+        if stamp is not None and (table not in cursors or stamp > cursors[table][0]):
+            cursors[table] = (stamp, row[CURSOR_COLUMN])
+
+
+def _same_song(a, b):
+    return all(a.get(field) == b.get(field) for field in ("title", "author", "bpm", "key", "time_signature", "changes"))
+
+
+# Other cogs import songdata; song_catalog fills it in place, in the background
+songdata = {}
+song_catalog = SongCatalog(songdata)
+
+
+# --- Search index ---
+# Everything _autocorrect_title matches on, normalised once per catalog version:
+# dicts for the exact / case-insensitive / author+title / title-only passes, and
+# character-trigram postings so the substring pass only verifies names that contain
+# every trigram of the query instead of running _norm over the whole catalog.
+def _trigrams(text: str):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class SongSearchIndex:
+    def __init__(self, songs: dict):
+        self.names = list(songs)
+        self.exact = set(self.names)
+        self.lower = {name.lower(): name for name in self.names}
+        self.author_title = {}  # (norm author, norm title) -> first name
+        self.by_title = {}  # norm title -> names
+        self.lowers = [name.lower() for name in self.names]
+        self.titles = []
+        for name in self.names:
+            info = songs.get(name, {})
+            title = norm_text(info.get("title", ""))
+            self.titles.append(title)
+            self.author_title.setdefault((norm_text(info.get("author", "")), title), name)
+            self.by_title.setdefault(title, []).append(name)
+        self._name_grams = self._postings(self.lowers)
+        self._title_grams = self._postings(self.titles)
+        self.norm_names = [norm_text(name) for name in self.names]
+        self._norm_name_grams = self._postings(self.norm_names)
+        self._norm_name_sizes = [len(_trigrams(text)) for text in self.norm_names]
+
+    @staticmethod
+    def _postings(texts):
+        postings = {}
+        for i, text in enumerate(texts):
+            for gram in _trigrams(text):
+                postings.setdefault(gram, set()).add(i)
+        return postings
+
+    def _containing(self, needle: str, texts, postings):
+        """Positions whose text contains needle: trigram candidates verified, or a scan for short needles."""
+        if len(needle) < 3:
+            return (i for i, text in enumerate(texts) if needle in text)
+        sets = sorted((postings.get(gram, set()) for gram in _trigrams(needle)), key=len)
+        candidates = set.intersection(*sets) if sets else set()
+        return (i for i in sorted(candidates) if needle in texts[i])
+
+    def unique_substring(self, query: str, q_norm: str):
+        """The one name containing query (or whose title contains q_norm), else None."""
+        found = None
+        for positions in (
+            self._containing(query.lower(), self.lowers, self._name_grams),
+            self._containing(q_norm, self.titles, self._title_grams),
+        ):
+            for i in positions:
+                if found is None:
+                    found = i
+                elif i != found:
+                    return None
+        return self.names[found] if found is not None else None
+
+    def _shared_grams(self, grams):
+        """position -> how many of grams its normalised name has, from the postings alone."""
+        shared = {}
+        for gram in grams:
+            for i in self._norm_name_grams.get(gram, ()):
+                shared[i] = shared.get(i, 0) + 1
+        return shared
+
+    def suggest(self, query: str, n=25):
+        """Autocomplete names: ones whose normalised name contains the query, then near misses
+        sharing most of its trigrams. Only touches the query's postings (or a short scan)."""
+        if not query:
+            return self.names[:n]
+        q_norm = norm_text(query)
+        picked = []
+        for i in self._containing(q_norm, self.norm_names, self._norm_name_grams):
+            picked.append(i)
+            if len(picked) >= n:
+                return [self.names[i] for i in picked]
+        grams = _trigrams(q_norm)
+        if grams:
+            shared = self._shared_grams(grams)
+            chosen = set(picked)
+            near = sorted((i for i, hits in shared.items() if hits * 2 >= len(grams) and i not in chosen),
+                          key=lambda i: (-shared[i], i))
+            picked.extend(near[:n - len(picked)])
+        return [self.names[i] for i in picked]
+
+    def closest(self, query: str, cutoff=0.6):
+        """The name most similar to query by trigram overlap (Dice), if it reaches cutoff; else None."""
+        grams = _trigrams(norm_text(query))
+        if not grams:
+            return None
+        best, best_score = None, cutoff
+        for i, hits in self._shared_grams(grams).items():
+            score = 2 * hits / (len(grams) + self._norm_name_sizes[i])
+            if score > best_score or (score == best_score and best is None):
+                best, best_score = i, score
+        return self.names[best] if best is not None else None
+
+    def resolve(self, query: str):
+        """(name, reason) for an exact, author+title, title-only or unique substring match; (None, None) otherwise.
+
+        reason is None for a verbatim name. Nothing fuzzy happens here, so an ambiguous
+        or mistyped query resolves to nothing rather than to some other song.
+        """
+        if not query:
+            return None, None
+
+        # Exact match (including parentheses)
+        if query in self.exact:
+            return query, None
+
+        # Case-insensitive exact full-key match
+        if query.lower() in self.lower:
+            corrected = self.lower[query.lower()]
+            return corrected, f"Matched case-insensitive → **{corrected}**"
+
+        q_norm = norm_text(query)
+
+        # If user provided "author - title" without parentheses, try to match both author and title
+        if "-" in query:
+            parts = [p.strip() for p in query.split("-", 1)]
+            if len(parts) == 2:
+                name = self.author_title.get((norm_text(parts[0]), norm_text(parts[1])))
+                if name is not None:
+                    return name, f"Matched author and title → **{name}**"
+
+        # Title-only exact normalized match (useful when user types only the song name)
+        title_matches = self.by_title.get(q_norm, [])
+        if len(title_matches) == 1:
+            return title_matches[0], f"Matched song title → **{title_matches[0]}**"
+
+        # Unique substring match (checks both full key and title)
+        sub = self.unique_substring(query, q_norm)
+        if sub is not None:
+            return sub, f"Unique substring match → **{sub}**"
+
+        return None, None
+
+
+_search_index = None
+_search_version = None
+
+
+def search_index() -> SongSearchIndex:
+    """The SongSearchIndex for the current catalog, rebuilt only when its version moves."""
+    global _search_index, _search_version
+    if _search_index is None or _search_version != song_catalog.version:
+        _search_index = SongSearchIndex(songdata)
+        _search_version = song_catalog.version
+        logger.info("Song search index built: %d songs (version %d)", len(_search_index.names), _search_version)
+    return _search_index
+
+
+async def rebuild_search_index():
+    """Build the index for the current catalog in a worker thread, so commands rarely build it inline."""
+    global _search_index, _search_version
+    version = song_catalog.version
+    index = await asyncio.to_thread(SongSearchIndex, dict(songdata))
+    if version == song_catalog.version:
+        _search_index, _search_version = index, version
+        logger.info("Song search index built: %d songs (version %d)", len(index.names), version)
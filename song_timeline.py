@@ -0,0 +1,100 @@
+import logging
+from bisect import bisect_right
+
+logger = logging.getLogger(__name__)
+
+
+def parse_timestamp(value):
+    """Seconds from 72, 72.5, "72", "1:12" or "0:01:12.5"; None if it can't be read."""
+    if isinstance(value, (int, float)):
+        return float(value) if value >= 0 else None
+    if not isinstance(value, str) or not value.strip():
+        return None
+    seconds = 0.0
+    try:
+        for part in value.strip().split(":"):
+            seconds = seconds * 60 + float(part)
+    except ValueError:
+        return None
+    return seconds if seconds >= 0 else None
+
+
+def format_timestamp(seconds: float) -> str:
+    minutes, secs = divmod(int(seconds), 60)
+    if minutes >= 60:
+        hours, minutes = divmod(minutes, 60)
+        return f"{hours}:{minutes:02d}:{secs:02d}"
+    return f"{minutes}:{secs:02d}"
+
+
+class Section:
+    __slots__ = ("start", "end", "bpm", "key")
+
+    def __init__(self, start, end, bpm, key):
+        self.start = start
+        self.end = end  # None for the last section
+        self.bpm = bpm
+        self.key = key
+
+    def label(self) -> str:
+        end = format_timestamp(self.end) if self.end is not None else "end"
+        return f"{format_timestamp(self.start)}–{end}"
+
+    def __repr__(self):
+        return f"Section({self.label()}, bpm={self.bpm!r}, key={self.key!r})"
+
+
+# --- Song timelines ---
+# A song's `changes` array ({"time", "bpm"?, "key"?} entries) turned into sorted
+# breakpoints. Each section carries the BPM and key in effect from its start until the
+# next change, so at() is one bisect over the start times.
+class Timeline:
+    def __init__(self, bpm=None, key=None, changes=()):
+        points = {}
+        for change in changes or ():
+            if not isinstance(change, dict):
+                continue
+            start = parse_timestamp(change.get("time"))
+            if start is None:
+                logger.debug("Skipping change with unreadable time: %r", change)
+                continue
+            point = points.setdefault(start, {})
+            if change.get("bpm") is not None:
+                point["bpm"] = change["bpm"]
+            if change.get("key"):
+                point["key"] = change["key"]
+
+        self.starts = [0.0]
+        self.sections = [Section(0.0, None, bpm, key)]
+        for start in sorted(points):
+            current = self.sections[-1]
+            new_bpm = points[start].get("bpm", current.bpm)
+            new_key = points[start].get("key", current.key)
+            if (new_bpm, new_key) == (current.bpm, current.key):
+                continue
+            if start == current.start:
+                # A change at 0:00 just overrides the headline values
+                current.bpm, current.key = new_bpm, new_key
+                continue
+            current.end = start
+            self.starts.append(start)
+            self.sections.append(Section(start, None, new_bpm, new_key))
+
+    @classmethod
+    def from_song(cls, info: dict):
+        """Timeline for a songdata entry ({"bpm", "key", "changes"})."""
+        return cls(info.get("bpm"), info.get("key"), info.get("changes"))
+
+    def __len__(self):
+        return len(self.sections)
+
+    def __iter__(self):
+        return iter(self.sections)
+
+    @property
+    def has_changes(self) -> bool:
+        return len(self.sections) > 1
+
+    def at(self, seconds: float) -> Section:
+        """The section playing at a timestamp (O(log k) in the number of changes)."""
+        return self.sections[max(bisect_right(self.starts, seconds) - 1, 0)]
@@ -0,0 +1,58 @@
+-- Batched atomic Slop Points increment used by slop_points.PointsLedger.flush().
+-- p_rows is a JSON array of {"user_id", "delta", "name", "house_seen"} objects (one
+-- per user, deltas already merged). Each delta is added server-side, creating rows
+-- as needed, and the new stored balances are returned so the bot can resync its copy.
+--
+-- p_house_delta is the sum of owner-bet shares since the last flush. Instead of
+-- rewriting every member row, it is added to the 'house_offset' row in miscinfo;
+-- a member's real balance is points - (house_offset - house_seen), and the bot
+-- folds the outstanding part into the row the next time it writes that user.
+--
+-- p_batch_id makes retries safe: the bot resends a batch under the same id when a call
+-- fails or times out, and an id already in points_batches is not applied again (the
+-- current balances are returned instead). Ids older than a day are pruned.
+alter table points add column if not exists house_seen bigint not null default 0;
+
+create table if not exists points_batches (
+    batch_id text primary key,
+    applied_at timestamptz not null default now()
+);
+
+drop function if exists increment_points_batch(jsonb);
+drop function if exists increment_points_batch(jsonb, bigint);
+
+create or replace function increment_points_batch(p_rows jsonb, p_house_delta bigint default 0, p_batch_id text default null)
+returns table (out_user_id text, out_points bigint)
+language plpgsql
+as $$
+begin
+    if p_batch_id is not null then
+        insert into points_batches (batch_id) values (p_batch_id) on conflict do nothing;
+        if not found then
+            return query
+            select p.user_id, p.points
+            from points p
+            where p.user_id in (select r.user_id from jsonb_to_recordset(p_rows) as r(user_id text));
+            return;
+        end if;
+        delete from points_batches where applied_at < now() - interval '1 day';
+    end if;
+
+    if p_house_delta <> 0 then
+        update miscinfo set count = count + p_house_delta where attribute = 'house_offset';
+        if not found then
+            insert into miscinfo (attribute, count) values ('house_offset', p_house_delta);
+        end if;
+    end if;
+
+    return query
+    insert into points as p (user_id, name, points, house_seen)
+    select r.user_id, coalesce(r.name, 'Unknown'), r.delta, r.house_seen
+    from jsonb_to_recordset(p_rows) as r(user_id text, delta bigint, name text, house_seen bigint)
+    on conflict (user_id) do update
+        set points = p.points + excluded.points,
+            name = case when excluded.name = 'Unknown' then p.name else excluded.name end,
+            house_seen = excluded.house_seen
+    returning p.user_id, p.points;
+end;
+$$;
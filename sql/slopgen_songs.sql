@@ -0,0 +1,58 @@
+-- Song pools for SlopGenReal's /gen, editable without a redeploy (run /reload_songs after
+-- changing rows). pool 1 songs are the instrumentals (tolerance_down/up = how far they can
+-- be pitched in semitones), pool 2 the vocals (tolerance_down/up = allowed BPM change).
+-- A null tolerance falls back to the default for that pool.
+create table if not exists slopgen_songs (
+    pool smallint not null check (pool in (1, 2)),
+    title text not null,
+    bpm double precision not null,
+    key text not null,
+    tolerance_down double precision,
+    tolerance_up double precision,
+    primary key (pool, title)
+);
+
+-- Seed with the pools that used to be hard-coded in SlopGenReal.py
+insert into slopgen_songs (pool, title, bpm, key, tolerance_down, tolerance_up) values
+    (1, 'Creo - Atmosphere', 128, 'F#m', 3, 3),
+    (1, 'dj-Nate - Clubstep', 128, 'Em', 5, 4),
+    (1, 'Panda Eyes - Antipixel', 128, 'C#m', 3, 2),
+    (1, 'Jewelz123 - Silent Hill Dubstep', 70, 'Gm', 5, 3),
+    (1, 'Bossfight - Milky Ways', 183, 'Em', 3, 2),
+    (1, 'Hinkik - Time Leaper', 87.5, 'A#m', 3, 2),
+    (1, 'Hinkik - Outbreaker', 128, 'C#m', 4, 3),
+    (1, 'Hinkik - Ena', 128, 'Dm', 3, 2),
+    (1, 'Creo - Idolize', 80, 'B Lydian', 3, 3),
+    (1, 'Creo - Red Haze', 80, 'F', 3, 3),
+    (1, 'R4bbit - Make It Drop', 135, 'Gm', 4, 2),
+    (1, 'Schtiffles - In The Tigers Den', 132, 'Cm', 3, 4),
+    (1, 'Creo - In Circles', 92.5, 'D#m', 3, 3),
+    (1, 'Virtual Riot - Idols', 128, 'Gm', 3, 4),
+    (1, 'Vierre Cloud - Moment', 171.25, 'A#m+0.5', 3.5, 4.5),
+    (1, 'Waterflame - Ricochet Love', 165, 'A#m', 3, 3),
+    (1, 'Waterflame - Time Machine', 143, 'F# Dorian+0.5', 2.5, 3.5),
+    (1, 'Creo - Flow', 64, 'C Phrygian', 2, 2),
+    (1, 'Xtrullor - Disordered Worlds', 133, 'C#m', null, null),
+    (1, 'Creo - Never Make It', 114, 'G#m', 3, 3),
+    (1, 'Panda Eyes & Teminite - Highscore', 110, 'A# Dorian', 4, 3),
+    (2, 'Ke$ha - Take It Off', 125, 'Fm', 12, 15),
+    (2, 'Ke$ha - Die Young', 128, 'E', 8, 12),
+    (2, 'Ke$ha - We R Who We R', 120, 'Cm', 5, 15),
+    (2, 'Cartoon - On & On', 87, 'B', 3, 3),
+    (2, 'Lady Gaga - Applause', 140, 'Gm', 8, 15),
+    (2, 'LMFAO - Sexy And I Know It', 130, 'Gm', 11, 10),
+    (2, 'Kendrick Lamar - Reincarnated', 91.1, '', 4.1, 8),
+    (2, 'The Black Eyed Peas - Rock That Body', 125, 'Dm', 6, 19),
+    (2, 'The Weeknd - Heartless', 85, 'D#m', 7, 4),
+    (2, 'Kanye West - Good Life', 84.99, 'C#', 2.99, 12.1),
+    (2, 'Kanye West - Black Skinhead', 130, '', 7, 15),
+    (2, 'Flo Rida - Good Feeling', 128, 'C#m', 10, 12),
+    (2, 'Lil'' Nas X - J Christ', 75, 'A Phrygian', 3, 8),
+    (2, 'Demi Lovato - Heart Attack', 87, 'G#', 7, 5),
+    (2, 'Miley Cyrus - Party In The USA', 96, 'F#', 14, 4),
+    (2, 'One Direction - What Makes You Beautiful', 125, 'E', 10, 15),
+    (2, 'Eminem - Beautiful', 66, 'F Minor', 7, 10.44),
+    (2, 'femtanyl, ISSBROKIE - NASTYWERKKKK!', 133, '', null, null),
+    (2, 'Imagine Dragons - Bones', 114, 'A#m', 7, 10),
+    (2, '2hollis - Poster Boy', 111, 'F#m', 7, 10)
+on conflict (pool, title) do nothing;
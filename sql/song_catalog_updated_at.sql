@@ -0,0 +1,22 @@
+-- updated_at cursor for Find_Key's song catalog: the bot only re-reads rows changed since
+-- the newest updated_at it has seen. Existing rows get now() when the column is added.
+alter table gdsongdata add column if not exists updated_at timestamptz not null default now();
+alter table nongdsongdata add column if not exists updated_at timestamptz not null default now();
+
+create index if not exists gdsongdata_updated_at_idx on gdsongdata (updated_at);
+create index if not exists nongdsongdata_updated_at_idx on nongdsongdata (updated_at);
+
+create or replace function set_updated_at() returns trigger as $$
+begin
+    new.updated_at = now();
+    return new;
+end;
+$$ language plpgsql;
+
+drop trigger if exists gdsongdata_set_updated_at on gdsongdata;
+create trigger gdsongdata_set_updated_at before update on gdsongdata
+    for each row execute function set_updated_at();
+
+drop trigger if exists nongdsongdata_set_updated_at on nongdsongdata;
+create trigger nongdsongdata_set_updated_at before update on nongdsongdata
+    for each row execute function set_updated_at();
@@ -0,0 +1,8 @@
+-- Unique row id for gdsongdata / nongdsongdata. Titles repeat across authors, so the
+-- bot's paged loads (SlopDB.select_pages) order by id to keep range requests stable.
+-- A no-op where the tables already have the usual Supabase identity id.
+alter table gdsongdata add column if not exists id bigint generated by default as identity;
+alter table nongdsongdata add column if not exists id bigint generated by default as identity;
+
+create unique index if not exists gdsongdata_id_key on gdsongdata (id);
+create unique index if not exists nongdsongdata_id_key on nongdsongdata (id);